@@ -0,0 +1,162 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+from app import settings
+
+OVERLOADED_DETAIL = "Servidor sobrecarregado, tente novamente"
+
+
+class AdmissionController:
+    """
+    Limita as requisições em execução simultânea e a fila de espera.
+
+    Quando a fila está cheia, ou quando uma requisição espera mais que `max_wait`
+    segundos por uma vaga, ela é rejeitada imediatamente em vez de ficar acumulada
+    no threadpool com latência ilimitada.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, max_wait: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.inflight = 0
+        # Requisições fora do controle de admissão (long-poll, SSE, administração) em andamento
+        self.exempt_inflight = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_wait_timeout = 0
+        self.last_wait = 0.0
+        self.max_observed_wait = 0.0
+        self.last_activity = time.monotonic()
+        self._waiters = deque()
+
+    async def acquire(self) -> bool:
+        self.last_activity = time.monotonic()
+        if self.inflight < self.max_concurrency and not self._waiters:
+            self.inflight += 1
+            self._admit(0.0)
+            return True
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_queue_full += 1
+            return False
+
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if waiter.done():
+            # A vaga foi transferida por release()
+            self._admit(time.monotonic() - start)
+            return True
+        self._abandon(waiter)
+        self.rejected_wait_timeout += 1
+        return False
+
+    def release(self):
+        self.last_activity = time.monotonic()
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Transfere a vaga diretamente para o próximo da fila
+                waiter.set_result(None)
+                return
+        self.inflight -= 1
+
+    def enter_exempt(self):
+        self.last_activity = time.monotonic()
+        self.exempt_inflight += 1
+
+    def exit_exempt(self):
+        self.last_activity = time.monotonic()
+        self.exempt_inflight -= 1
+
+    def idle_for(self) -> float:
+        """
+        Segundos desde a última requisição (0 se houver requisições em andamento, inclusive
+        as que ficam fora do controle de admissão, como long-polls e streams SSE).
+        """
+        if self.inflight or self.exempt_inflight or self._waiters:
+            return 0.0
+        return time.monotonic() - self.last_activity
+
+    def _abandon(self, waiter):
+        if waiter.done() and not waiter.cancelled():
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _admit(self, wait: float):
+        self.admitted += 1
+        self.last_wait = wait
+        self.max_observed_wait = max(self.max_observed_wait, wait)
+
+    def stats(self) -> dict:
+        return {
+            "inflight": self.inflight,
+            "exempt_inflight": self.exempt_inflight,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "admitted_total": self.admitted,
+            "rejected_queue_full_total": self.rejected_queue_full,
+            "rejected_wait_timeout_total": self.rejected_wait_timeout,
+            "last_wait_seconds": round(self.last_wait, 6),
+            "max_wait_observed_seconds": round(self.max_observed_wait, 6),
+        }
+
+
+admission = AdmissionController(
+    settings.ADMISSION_MAX_CONCURRENCY, settings.ADMISSION_MAX_QUEUE, settings.ADMISSION_MAX_WAIT
+)
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, controller: AdmissionController = admission):
+        self.app = app
+        self.controller = controller
+        self.exempt_paths = tuple(settings.ADMISSION_EXEMPT_PATHS)
+        self.retry_after = str(settings.ADMISSION_RETRY_AFTER).encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if scope["path"].startswith(self.exempt_paths):
+            # Não ocupa vaga, mas conta como atividade para a manutenção em segundo plano
+            self.controller.enter_exempt()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self.controller.exit_exempt()
+            return
+
+        if not await self.controller.acquire():
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": OVERLOADED_DETAIL}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"retry-after", self.retry_after),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
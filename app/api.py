@@ -1,31 +1,101 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from database.database import Base, engine, get_db
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from routers.users import router as users_router
 from routers.suppliers import router as suppliers_router
 from routers.orders import router as orders_router
 from routers.address import router as address_router
 from routers.login import router as login_router
+from routers.admin import router as admin_router
+from app import passwords, profiling, settings
+from app.admission import OVERLOADED_DETAIL, AdmissionControlMiddleware
+from app.changefeed import change_feed
+from app.coalescing import RequestCoalescingMiddleware
+from app.idempotency import IdempotencyMiddleware
+from app.maintenance import maintenance
 
 
-# Cria a aplicação FastAPI
-app = FastAPI(title="optics-api", description="API para gerenciamento de óticas", version="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Threads disponíveis para as rotas síncronas deste processo
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    # O leitor de mudanças de pedidos é iniciado sob demanda (primeiro assinante)
+    if settings.MAINTENANCE_ENABLED:
+        maintenance.start()
+    yield
+    await maintenance.stop()
+    await change_feed.stop()
+    passwords.shutdown()
 
-# Configura o CORS (Cross-Origin Resource Sharing)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Cria as tabelas no banco de dados
-Base.metadata.create_all(bind=engine)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Nenhuma conexão do pool ficou livre em DB_POOL_TIMEOUT segundos
+    return JSONResponse(
+        status_code=503,
+        content={"detail": OVERLOADED_DETAIL},
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+    )
 
-# Inclui as rotas
-app.include_router(login_router)
-app.include_router(users_router)
-app.include_router(suppliers_router)
-app.include_router(orders_router)
-app.include_router(address_router)
\ No newline at end of file
+
+def create_app() -> FastAPI:
+    """
+    Cria a aplicação FastAPI.
+
+    Não cria nem altera tabelas: o esquema do banco é preparado uma única vez por
+    `database.migrations.migrate()` (executado por main.py, serve.py ou
+    `python -m database.migrations`), e não a cada processo que importa a aplicação.
+    """
+    app = FastAPI(
+        title="optics-api",
+        description="API para gerenciamento de óticas",
+        version="1.0",
+        lifespan=lifespan
+    )
+    app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
+    # Rejeita com 503 as requisições que excedem a fila ou o tempo de espera configurados.
+    # Fica dentro do agrupamento para que requisições agrupadas ocupem uma única vaga.
+    app.add_middleware(AdmissionControlMiddleware)
+
+    # Agrupa requisições GET concorrentes e idênticas nas rotas configuradas.
+    # Deve ficar dentro do CORS para que os cabeçalhos de origem sejam calculados por cliente.
+    app.add_middleware(RequestCoalescingMiddleware)
+
+    # Armazena e reaproveita as respostas de POST enviados com o cabeçalho Idempotency-Key
+    app.add_middleware(IdempotencyMiddleware)
+
+    # Configura o CORS (Cross-Origin Resource Sharing)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["ETag", "X-Total-Count", "X-Total-Count-Estimated", "Idempotent-Replayed"],
+    )
+
+    # Inclui as rotas
+    app.include_router(login_router)
+    app.include_router(users_router)
+    app.include_router(suppliers_router)
+    app.include_router(orders_router)
+    app.include_router(address_router)
+    app.include_router(admin_router)
+
+    # Perfilamento opcional (PROFILE_ENABLED ou PROFILE_SAMPLE_RATE): por último, para que o
+    # middleware fique por fora de todos os outros e as rotas já estejam registradas
+    if profiling.is_enabled():
+        profiling.instrument(app)
+    return app
+
+
+def __getattr__(name):
+    # `app.api:app` continua disponível (ex.: `uvicorn app.api:app`), mas só é criado quando usado
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
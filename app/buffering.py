@@ -0,0 +1,36 @@
+class BufferedResponse:
+    """
+    Resposta HTTP já serializada (status, cabeçalhos e corpo) que pode ser
+    reenviada a quantos clientes forem necessários.
+    """
+
+    def __init__(self, status: int, headers: list, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    async def send(self, send, extra_headers: list = ()):
+        await send({
+            "type": "http.response.start",
+            "status": self.status,
+            "headers": list(self.headers) + list(extra_headers),
+        })
+        await send({"type": "http.response.body", "body": self.body})
+
+
+async def buffer_response(app, scope, receive) -> BufferedResponse:
+    """Executa a aplicação ASGI e acumula a resposta em memória em vez de enviá-la."""
+    status = 500
+    headers = []
+    chunks = []
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return BufferedResponse(status, headers, b"".join(chunks))
@@ -0,0 +1,167 @@
+import asyncio
+import bisect
+import time
+
+from sqlalchemy import event
+from starlette.concurrency import run_in_threadpool
+
+from app import settings
+from crud.order_changes import *
+from database.database import SessionLocal, run_with_session
+
+# Quantidade máxima de mudanças lidas do banco a cada despertar
+READ_BATCH_SIZE = 500
+
+
+class OrderChangeFeed:
+    """
+    Distribui o log de mudanças de pedidos (`order_changes`) aos assinantes.
+
+    Uma única tarefa lê o banco a cada despertar (commit de pedido neste processo ou
+    intervalo de polling, para escritas de outros processos) e guarda as mudanças em
+    um buffer em memória; todos os long-polls e streams SSE conectados são atendidos
+    a partir desse buffer, filtrando por fornecedor em memória.
+    """
+
+    def __init__(self, poll_interval: float, buffer_size: int):
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.reads = 0
+        # Ordenado por seq; as mudanças mais antigas são descartadas em blocos (ver _append)
+        self._buffer = []
+        # O buffer contém todas as mudanças com seq > _floor
+        self._floor = 0
+        self._last_seq = 0
+        self._loop = None
+        self._wakeup = None
+        self._condition = None
+        self._task = None
+        self._start_lock = asyncio.Lock()
+
+    def notify(self):
+        """Acorda o leitor. Pode ser chamado de qualquer thread."""
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def start(self):
+        async with self._start_lock:
+            if self._task is not None:
+                return
+            self._wakeup = asyncio.Event()
+            self._condition = asyncio.Condition()
+            self._last_seq = self._floor = await run_in_threadpool(run_with_session, get_last_order_change_seq)
+            self._buffer.clear()
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def current_seq(self) -> int:
+        await self.start()
+        return self._last_seq
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                changes = await run_in_threadpool(
+                    run_with_session, get_order_changes_since, self._last_seq, None, READ_BATCH_SIZE
+                )
+            except Exception:
+                continue
+            self.reads += 1
+            if not changes:
+                continue
+            self._append(changes)
+            if len(changes) == READ_BATCH_SIZE:
+                self._wakeup.set()
+            async with self._condition:
+                self._condition.notify_all()
+
+    def _append(self, changes):
+        self._buffer.extend(changes)
+        self._last_seq = changes[-1]["seq"]
+        # Descarta em blocos de 10% para que a cópia da lista não aconteça a cada leitura
+        excess = len(self._buffer) - self.buffer_size
+        if excess > self.buffer_size // 10:
+            self._floor = self._buffer[excess - 1]["seq"]
+            del self._buffer[:excess]
+
+    def _scan(self, since: int, supplier_id: int, limit: int):
+        changes = []
+        # As seqs são crescentes: começa na primeira mudança com seq > since
+        start = bisect.bisect_right(self._buffer, since, key=lambda change: change["seq"])
+        for index in range(start, len(self._buffer)):
+            change = self._buffer[index]
+            if supplier_id is not None and change["supplier_id"] != supplier_id:
+                continue
+            changes.append(change)
+            if len(changes) == limit:
+                return changes, change["seq"]
+        return changes, max(since, self._last_seq)
+
+    async def wait_for_changes(self, since: int, supplier_id: int = None, timeout: float = 0, limit: int = 100):
+        """
+        Retorna (mudanças com seq > since, cursor para a próxima chamada),
+        aguardando até `timeout` segundos caso ainda não haja mudanças.
+        """
+        await self.start()
+        if since < self._floor:
+            # Cliente atrasado em relação ao buffer: recupera direto do banco
+            known_seq = self._last_seq
+            changes = await run_in_threadpool(
+                run_with_session, get_order_changes_since, since, supplier_id, limit
+            )
+            if len(changes) == limit:
+                return changes, changes[-1]["seq"]
+            if changes:
+                return changes, max(changes[-1]["seq"], known_seq)
+            since = max(since, known_seq)
+
+        deadline = time.monotonic() + timeout
+        async with self._condition:
+            while True:
+                changes, cursor = self._scan(since, supplier_id, limit)
+                remaining = deadline - time.monotonic()
+                if changes or remaining <= 0:
+                    return changes, cursor
+                try:
+                    await asyncio.wait_for(self._condition.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "reads": self.reads,
+            "last_seq": self._last_seq,
+            "buffered": len(self._buffer),
+        }
+
+
+change_feed = OrderChangeFeed(settings.CHANGE_FEED_POLL_INTERVAL, settings.CHANGE_FEED_BUFFER_SIZE)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _notify_change_feed(session):
+    if session.info.pop(PENDING_CHANGES_KEY, False):
+        change_feed.notify()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_pending_changes(session):
+    session.info.pop(PENDING_CHANGES_KEY, None)
@@ -0,0 +1,93 @@
+import asyncio
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.routing import Match
+
+from app import settings
+from app.buffering import buffer_response
+
+
+class RequestCoalescer:
+    """
+    Agrupa requisições GET concorrentes e idênticas (singleflight).
+
+    A primeira requisição de um grupo executa a rota normalmente; as que chegam
+    enquanto ela está em andamento aguardam o mesmo resultado e recebem a mesma
+    resposta já serializada, sem executar outra consulta no banco.
+    """
+
+    def __init__(self, routes=()):
+        self.routes = set(routes)
+        self._inflight = {}
+        self._stats = defaultdict(lambda: {"executed": 0, "coalesced": 0})
+
+    def enable(self, route_path: str):
+        self.routes.add(route_path)
+
+    def disable(self, route_path: str):
+        self.routes.discard(route_path)
+
+    def stats(self) -> dict:
+        return {
+            "routes": sorted(self.routes),
+            "inflight": len(self._inflight),
+            "counters": {route: dict(counters) for route, counters in self._stats.items()},
+        }
+
+    def match_route(self, scope):
+        # Resolve o template da rota (ex.: "/suppliers/{supplier_id}") a partir da requisição
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                path = getattr(route, "path", None)
+                return path if path in self.routes else None
+        return None
+
+    def make_key(self, route_path: str, scope) -> tuple:
+        query = urlencode(sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"))))
+        headers = dict(scope.get("headers", []))
+        # O escopo de autenticação faz parte da chave: clientes diferentes nunca
+        # compartilham respostas entre si.
+        auth = headers.get(b"authorization", b"")
+        return route_path, scope["path"], query, auth
+
+    async def run(self, app, route_path: str, scope, receive):
+        key = self.make_key(route_path, scope)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._execute(app, key, scope, receive))
+            self._inflight[key] = task
+            self._stats[route_path]["executed"] += 1
+        else:
+            self._stats[route_path]["coalesced"] += 1
+        # shield: o cancelamento de um cliente não interrompe a execução dos demais
+        return await asyncio.shield(task)
+
+    async def _execute(self, app, key, scope, receive):
+        try:
+            return await buffer_response(app, scope, receive)
+        finally:
+            self._inflight.pop(key, None)
+
+
+coalescer = RequestCoalescer(settings.COALESCED_ROUTES)
+
+
+class RequestCoalescingMiddleware:
+    def __init__(self, app, coalescer: RequestCoalescer = coalescer):
+        self.app = app
+        self.coalescer = coalescer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.coalescer.routes:
+            await self.app(scope, receive, send)
+            return
+
+        route_path = self.coalescer.match_route(scope)
+        if route_path is None:
+            await self.app(scope, receive, send)
+            return
+
+        response = await self.coalescer.run(self.app, route_path, scope, receive)
+        await response.send(send)
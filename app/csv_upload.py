@@ -0,0 +1,28 @@
+import csv
+import io
+from itertools import chain
+from fastapi import HTTPException, UploadFile
+
+
+def open_csv(file: UploadFile, schema) -> csv.DictReader:
+    """
+    Abre o CSV enviado para leitura linha a linha, sem carregá-lo inteiro na memória.
+
+    Aceita UTF-8 (com ou sem BOM) e separador vírgula ou ponto e vírgula. Retorna 400 se
+    faltar alguma coluna obrigatória de `schema`.
+    """
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        sample = text.readline()
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="O arquivo deve estar em UTF-8")
+    delimiter = ";" if sample.count(";") > sample.count(",") else ","
+    reader = csv.DictReader(chain([sample], text), delimiter=delimiter)
+    reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+    missing = [
+        name for name, field in schema.model_fields.items()
+        if field.is_required() and name not in reader.fieldnames
+    ]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+    return reader
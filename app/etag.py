@@ -0,0 +1,19 @@
+from typing import Optional
+from fastapi import HTTPException
+
+
+def make_etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Converte o cabeçalho If-Match ("3", W/"3" ou *) na versão esperada do registro."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    value = if_match.strip()
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cabeçalho If-Match inválido")
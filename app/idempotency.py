@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.concurrency import run_in_threadpool
+
+from app import settings
+from app.admission import OVERLOADED_DETAIL
+from app.buffering import BufferedResponse, buffer_response
+from crud.idempotency import *
+from database.database import run_with_session
+
+REPLAY_HEADER = (b"idempotent-replayed", b"true")
+
+
+def _json_response(status: int, detail: str, headers: list = ()) -> BufferedResponse:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    return BufferedResponse(status, [(b"content-type", b"application/json"), *headers], body)
+
+
+def _encode_headers(headers: list) -> str:
+    return json.dumps([[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers])
+
+
+def _stored_response(record) -> BufferedResponse:
+    if record.headers is not None:
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(record.headers)]
+    else:
+        # Registros gravados antes da coluna `headers`: apenas o content-type
+        headers = []
+        if record.content_type:
+            headers.append((b"content-type", record.content_type.encode("latin-1")))
+    return BufferedResponse(record.status_code, headers, record.body or b"")
+
+
+class IdempotencyMiddleware:
+    """
+    Suporte ao cabeçalho `Idempotency-Key` nas rotas POST configuradas.
+
+    A primeira resposta (exceto erros 5xx) é armazenada na tabela `idempotency_keys`
+    e devolvida nas repetições sem executar a rota novamente. Repetições concorrentes
+    aguardam a requisição original: no mesmo processo pela tarefa em andamento e,
+    entre processos, pelo registro "em andamento" no banco.
+    """
+
+    def __init__(self, app, routes=None):
+        self.app = app
+        self.routes = set(settings.IDEMPOTENT_ROUTES if routes is None else routes)
+        self.ttl = timedelta(seconds=settings.IDEMPOTENCY_TTL)
+        self.wait_timeout = settings.IDEMPOTENCY_WAIT_TIMEOUT
+        self.lock_timeout = timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+        self._inflight = {}
+        self._last_cleanup = float("-inf")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.routes:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers", []))
+        idempotency_key = headers.get(b"idempotency-key")
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        key = " ".join([
+            "POST",
+            scope["path"],
+            hashlib.sha256(headers.get(b"authorization", b"")).hexdigest()[:16],
+            idempotency_key.decode("latin-1"),
+        ])
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        entry = self._inflight.get(key)
+        if entry is not None:
+            inflight_hash, task = entry
+            if inflight_hash != request_hash:
+                await _json_response(422, "Idempotency-Key reutilizada com um corpo diferente").send(send)
+                return
+            # Reaproveita a resposta da requisição original apenas se ela foi armazenada
+            response, _, stored = await asyncio.shield(task)
+            await response.send(send, [REPLAY_HEADER] if stored else [])
+            return
+
+        task = asyncio.ensure_future(self._execute(key, request_hash, scope, body, receive))
+        self._inflight[key] = (request_hash, task)
+        response, replayed, _ = await asyncio.shield(task)
+        await response.send(send, [REPLAY_HEADER] if replayed else [])
+
+    async def _read_body(self, receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _execute(self, key, request_hash, scope, body, receive):
+        try:
+            return await self._handle(key, request_hash, scope, body, receive)
+        except PoolTimeoutError:
+            # Pool de conexões esgotado ao consultar ou gravar a chave: nada foi armazenado
+            retry_after = str(settings.ADMISSION_RETRY_AFTER).encode("latin-1")
+            return _json_response(503, OVERLOADED_DETAIL, [(b"retry-after", retry_after)]), False, False
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _handle(self, key, request_hash, scope, body, receive):
+        """
+        Retorna (resposta, reaproveitada do banco, armazenada sob a chave). Só as respostas
+        armazenadas são reenviadas com `Idempotent-Replayed` às requisições concorrentes.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            record = await run_in_threadpool(run_with_session, get_idempotency_key, key)
+            if record is not None and record.status_code is not None:
+                if record.request_hash != request_hash:
+                    return _json_response(422, "Idempotency-Key reutilizada com um corpo diferente"), False, False
+                return _stored_response(record), True, True
+
+            # Sem registro, ou registro "em andamento" abandonado por um processo que caiu
+            if record is None or record.created_at < datetime.now() - self.lock_timeout:
+                claimed_at = await run_in_threadpool(
+                    run_with_session, claim_idempotency_key, key, request_hash, self.ttl, self.lock_timeout
+                )
+                if claimed_at is not None:
+                    break
+
+            # Outro processo está executando a requisição original
+            if time.monotonic() >= deadline:
+                return _json_response(409, "Requisição com esta Idempotency-Key ainda em andamento"), False, False
+            await asyncio.sleep(0.05)
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            response = await buffer_response(self.app, scope, replay_receive)
+        except Exception:
+            await run_in_threadpool(run_with_session, release_idempotency_key, key, claimed_at)
+            raise
+
+        if response.status >= 500:
+            # Erros do servidor não são armazenados: o cliente pode tentar novamente
+            await run_in_threadpool(run_with_session, release_idempotency_key, key, claimed_at)
+            return response, False, False
+        # Se a chave foi retomada por outra requisição, esta resposta não é armazenada
+        content_type = dict(response.headers).get(b"content-type", b"").decode("latin-1")
+        stored = await run_in_threadpool(
+            run_with_session, complete_idempotency_key, key, claimed_at, response.status, content_type,
+            _encode_headers(response.headers), response.body
+        )
+        await self._cleanup()
+        return response, False, stored
+
+    async def _cleanup(self):
+        now = time.monotonic()
+        if now - self._last_cleanup < settings.IDEMPOTENCY_CLEANUP_INTERVAL:
+            return
+        self._last_cleanup = now
+        await run_in_threadpool(run_with_session, delete_expired_idempotency_keys)
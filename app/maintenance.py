@@ -0,0 +1,161 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from starlette.concurrency import run_in_threadpool
+
+from app import settings
+from app.admission import admission
+from crud.maintenance import claim_maintenance_run, finish_maintenance_run, get_maintenance_runs
+from crud.order_archive import archive_orders
+from database import maintenance as tasks
+from database.database import run_with_session
+
+
+def _archive_orders():
+    archived = run_with_session(
+        archive_orders,
+        statuses=settings.ARCHIVE_TERMINAL_STATUSES,
+        older_than=datetime.now() - timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+        batch_size=settings.ARCHIVE_BATCH_SIZE
+    )
+    return f"{archived} pedidos arquivados"
+
+
+# Tarefas disponíveis: nome -> função síncrona que retorna a descrição do resultado
+TASKS = {
+    "optimize": tasks.optimize,
+    "incremental_vacuum": partial(tasks.incremental_vacuum, settings.MAINTENANCE_VACUUM_PAGES),
+    "checkpoint": tasks.checkpoint,
+    "backup": partial(
+        tasks.backup,
+        settings.BACKUP_DIR,
+        settings.BACKUP_KEEP,
+        settings.BACKUP_PAGES_PER_STEP,
+        settings.BACKUP_STEP_SLEEP
+    ),
+    "archive_orders": _archive_orders,
+    "enable_incremental_vacuum": tasks.enable_incremental_vacuum,
+}
+
+
+class MaintenanceScheduler:
+    """
+    Executa as tarefas de manutenção do banco em segundo plano.
+
+    A cada `check_interval` segundos, as tarefas vencidas são executadas se o processo
+    estiver ocioso há `quiet_seconds` segundos, ou mesmo sem ociosidade quando estão
+    atrasadas em mais de um intervalo. Com vários workers, a tabela `maintenance_runs`
+    garante que cada execução aconteça em um único processo; uma execução iniciada há
+    mais de `run_timeout` segundos e não finalizada é considerada abandonada.
+    """
+
+    def __init__(self, tasks: dict, intervals: dict, check_interval: float, quiet_seconds: float,
+                 run_timeout: float):
+        self.tasks = tasks
+        self.intervals = intervals
+        self.check_interval = check_interval
+        self.quiet_seconds = quiet_seconds
+        self.run_timeout = timedelta(seconds=run_timeout)
+        self.executed = 0
+        self._started_at = None
+        self._task = None
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._started_at = datetime.now()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.run_pending()
+            except Exception:
+                continue
+
+    def _overdue(self, task: str, run, now: datetime):
+        """Segundos de atraso da tarefa, ou None se ela ainda não venceu."""
+        interval = self.intervals.get(task, 0)
+        if interval <= 0:
+            return None
+        if run is None or run.last_started_at is None:
+            # Nunca executada: vence já, e o atraso conta a partir do início do processo
+            return (now - self._started_at).total_seconds()
+        overdue = (now - run.last_started_at).total_seconds() - interval
+        return overdue if overdue >= 0 else None
+
+    async def run_pending(self):
+        runs = await run_in_threadpool(run_with_session, get_maintenance_runs)
+        now = datetime.now()
+        for task in self.tasks:
+            overdue = self._overdue(task, runs.get(task), now)
+            if overdue is None:
+                continue
+            if admission.idle_for() < self.quiet_seconds and overdue < self.intervals[task]:
+                # Aguarda um período sem requisições
+                continue
+            await self.run_task(task, timedelta(seconds=self.intervals[task]))
+
+    async def run_task(self, task: str, interval: timedelta = None):
+        """
+        Executa a tarefa no threadpool e registra o resultado em `maintenance_runs`.
+        Retorna None se a tarefa já está em execução (ou já foi executada por outro processo).
+        """
+        claimed = await run_in_threadpool(
+            run_with_session, claim_maintenance_run, task, self.run_timeout, interval
+        )
+        if not claimed:
+            return None
+        start = time.perf_counter()
+        try:
+            detail = await run_in_threadpool(self.tasks[task])
+            status = "ok"
+        except Exception as exc:
+            detail = f"{type(exc).__name__}: {exc}"
+            status = "error"
+        duration = time.perf_counter() - start
+        await run_in_threadpool(run_with_session, finish_maintenance_run, task, status, detail, duration)
+        self.executed += 1
+        return {"task": task, "status": status, "detail": detail, "duration_seconds": round(duration, 6)}
+
+    def status(self, runs: dict) -> dict:
+        now = datetime.now()
+        return {
+            "running": self._task is not None,
+            "executed": self.executed,
+            "idle_seconds": round(admission.idle_for(), 3),
+            "tasks": {
+                task: {
+                    "interval_seconds": self.intervals.get(task, 0),
+                    "overdue_seconds": None if self._task is None else self._overdue(task, runs.get(task), now),
+                    "status": runs[task].status if task in runs else None,
+                    "detail": runs[task].detail if task in runs else None,
+                    "last_started_at": runs[task].last_started_at if task in runs else None,
+                    "last_finished_at": runs[task].last_finished_at if task in runs else None,
+                    "duration_seconds": runs[task].duration_seconds if task in runs else None,
+                }
+                for task in self.tasks
+            },
+        }
+
+
+maintenance = MaintenanceScheduler(
+    TASKS,
+    settings.MAINTENANCE_INTERVALS,
+    settings.MAINTENANCE_CHECK_INTERVAL,
+    settings.MAINTENANCE_QUIET_SECONDS,
+    settings.MAINTENANCE_RUN_TIMEOUT
+)
\ No newline at end of file
@@ -0,0 +1,11 @@
+from typing import Literal
+from fastapi import Response
+
+# "exact": total exato; "estimate": aceita total aproximado mais barato; "none": não calcula o total
+CountMode = Literal["exact", "estimate", "none"]
+
+
+def set_total_count(response: Response, total: int, estimated: bool = False):
+    response.headers["X-Total-Count"] = str(total)
+    if estimated:
+        response.headers["X-Total-Count-Estimated"] = "true"
@@ -0,0 +1,45 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+
+import bcrypt
+
+from app import settings
+from app.timing import span
+
+_executor = None
+_executor_lock = Lock()
+
+
+def hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Criado no primeiro uso, dentro do worker. "spawn" evita copiar com fork um
+            # processo que já tem threads (threadpool, loop de eventos, pool do banco).
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMPORT_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def hash_passwords(passwords: list) -> list:
+    """Calcula o hash bcrypt das senhas em paralelo, em processos separados."""
+    with span("bcrypt", f"hashpw x{len(passwords)}"):
+        if len(passwords) <= 1:
+            return [hash_password(password) for password in passwords]
+        chunksize = max(1, len(passwords) // (settings.IMPORT_HASH_WORKERS * 4))
+        return list(_get_executor().map(hash_password, passwords, chunksize=chunksize))
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
@@ -0,0 +1,312 @@
+import asyncio
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from anyio import to_thread
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.routing import request_response
+
+from app import settings
+from app.timing import _current_profile, span
+from database.database import engine, get_db
+
+PROFILE_HEADER = b"x-profile"
+
+# Profundidade máxima das pilhas amostradas e quantidade de pilhas gravadas por perfil
+MAX_STACK_DEPTH = 64
+MAX_STACKS = 200
+
+
+def is_enabled() -> bool:
+    return (settings.PROFILE_ENABLED and bool(settings.ADMIN_TOKEN)) or settings.PROFILE_SAMPLE_RATE > 0
+
+
+class Profile:
+    """Marcas de tempo, spans e amostras de pilha de uma requisição."""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.status = None
+        self.created_at = datetime.now()
+        self.start = time.perf_counter()
+        self.marks = {"request_start": self.start}
+        # (nome, início em ms desde o início da requisição, duração em ms, detalhe)
+        self.spans = []
+        self.samples = Counter()
+        # Threads em que a rota está executando (amostradas pelo StackSampler)
+        self.threads = set()
+
+    def mark(self, name: str):
+        self.marks[name] = time.perf_counter()
+
+    def add_span(self, name: str, start: float, end: float, detail: str = None):
+        self.spans.append((name, (start - self.start) * 1000, (end - start) * 1000, detail))
+
+    def _between(self, start: str, end: str):
+        if start not in self.marks or end not in self.marks:
+            return None
+        return (self.marks[end] - self.marks[start]) * 1000
+
+    def _span_total(self, name: str):
+        durations = [duration for span_name, _, duration, _ in self.spans if span_name == name]
+        return sum(durations), len(durations)
+
+    def breakdown(self) -> dict:
+        """Tempos em ms: (duração, quantidade) por etapa da requisição."""
+        get_db, _ = self._span_total("get_db")
+        get_db_close, _ = self._span_total("get_db.close")
+        validation = self._between("handler_start", "endpoint_start")
+        serialization = self._between("endpoint_end", "handler_end")
+        return {
+            # Middlewares (inclusive a fila do controle de admissão) e roteamento
+            "routing": (self._between("request_start", "handler_start"), None),
+            "get_db": (get_db + get_db_close, None),
+            # Leitura do corpo, dependências e validação (Pydantic) dos parâmetros
+            "validation": (None if validation is None else max(validation - get_db, 0), None),
+            "sql": self._span_total("sql"),
+            "bcrypt": self._span_total("bcrypt"),
+            "endpoint": (self._between("endpoint_start", "endpoint_end"), None),
+            # Validação e serialização (Pydantic) da resposta
+            "serialization": (None if serialization is None else max(serialization - get_db_close, 0), None),
+            "total": (self._between("request_start", "response_start"), None),
+        }
+
+    def server_timing(self) -> str:
+        metrics = []
+        for name, (duration, count) in self.breakdown().items():
+            if duration is None:
+                continue
+            metric = f"{name};dur={duration:.3f}"
+            if count is not None:
+                metric += f';desc="{count}"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "breakdown_ms": {
+                name: {"duration": None if duration is None else round(duration, 3), "count": count}
+                for name, (duration, count) in self.breakdown().items()
+            },
+            "spans": [
+                {"name": name, "start_ms": round(start, 3), "duration_ms": round(duration, 3), "detail": detail}
+                for name, start, duration, detail in self.spans
+            ],
+            # Formato "folded" (uma pilha por linha), compatível com geradores de flame graph
+            "samples": [f"{stack} {count}" for stack, count in self.samples.most_common(MAX_STACKS)],
+        }
+
+    def write(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        name = f"{self.created_at:%Y%m%d-%H%M%S}-{self.id}.json"
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Amostra periodicamente as pilhas das threads em que as requisições perfiladas executam.
+
+    Usa uma única thread, ativa apenas enquanto há perfis em andamento. Em rotas async a
+    thread amostrada é a do loop de eventos, compartilhada com as demais requisições.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+                self._thread.start()
+
+    def remove(self, profile: Profile):
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                profiles = list(self._profiles)
+            frames = sys._current_frames()
+            for profile in profiles:
+                for ident in list(profile.threads):
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        profile.samples[_fold(frame)] += 1
+
+
+sampler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL)
+
+
+class ProfilingMiddleware:
+    """
+    Perfila as requisições com o cabeçalho `X-Profile: <ADMIN_TOKEN>` ou sorteadas
+    com probabilidade `PROFILE_SAMPLE_RATE`.
+
+    As requisições com o cabeçalho recebem os tempos no cabeçalho `Server-Timing` e o id
+    do perfil em `X-Profile-Id`; todos os perfis são gravados em `PROFILE_DIR`.
+    """
+
+    def __init__(self, app, token: str = None, sample_rate: float = None, directory: str = None):
+        self.app = app
+        if token is None:
+            # Mesma credencial das rotas /admin
+            token = settings.ADMIN_TOKEN if settings.PROFILE_ENABLED else ""
+        self.token = token.encode("utf-8")
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.directory = settings.PROFILE_DIR if directory is None else directory
+
+    def _requested(self, scope) -> bool:
+        if not self.token:
+            return False
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        if not requested and not (self.sample_rate and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope["method"], scope["path"])
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                profile.mark("response_start")
+                profile.status = message["status"]
+                if requested:
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"server-timing", profile.server_timing().encode("latin-1")),
+                        (b"x-profile-id", profile.id.encode("latin-1")),
+                    ])
+            await send(message)
+
+        context_token = _current_profile.set(profile)
+        sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            sampler.remove(profile)
+            _current_profile.reset(context_token)
+            if self.directory:
+                await to_thread.run_sync(profile.write, self.directory)
+
+
+def _profiled_get_db():
+    dependency = get_db()
+    with span("get_db"):
+        db = next(dependency)
+    try:
+        yield db
+    finally:
+        with span("get_db.close"):
+            dependency.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    starts = conn.info.get("profile_query_start")
+    if profile is not None and starts:
+        profile.add_span("sql", starts.pop(), time.perf_counter(), " ".join(statement.split())[:500])
+
+
+def _profile_endpoint(call):
+    # Marca o início e o fim da função da rota e registra a thread em que ela executa
+    if asyncio.iscoroutinefunction(call):
+        async def endpoint(**values):
+            profile = _current_profile.get()
+            if profile is None:
+                return await call(**values)
+            profile.mark("endpoint_start")
+            profile.threads.add(threading.get_ident())
+            try:
+                return await call(**values)
+            finally:
+                profile.threads.discard(threading.get_ident())
+                profile.mark("endpoint_end")
+    else:
+        def endpoint(**values):
+            profile = _current_profile.get()
+            if profile is None:
+                return call(**values)
+            profile.mark("endpoint_start")
+            profile.threads.add(threading.get_ident())
+            try:
+                return call(**values)
+            finally:
+                profile.threads.discard(threading.get_ident())
+                profile.mark("endpoint_end")
+    return endpoint
+
+
+def _profile_handler(handler):
+    async def profiled_handler(request):
+        profile = _current_profile.get()
+        if profile is None:
+            return await handler(request)
+        profile.mark("handler_start")
+        try:
+            return await handler(request)
+        finally:
+            profile.mark("handler_end")
+    return profiled_handler
+
+
+def instrument(app):
+    """
+    Instala os pontos de medição na aplicação: rotas, dependência `get_db` e consultas SQL.
+    Chamada apenas quando o perfilamento está configurado; caso contrário nada é instalado.
+    """
+    app.dependency_overrides[get_db] = _profiled_get_db
+    for route in app.router.routes:
+        if isinstance(route, APIRoute):
+            route.dependant.call = _profile_endpoint(route.dependant.call)
+            route.app = request_response(_profile_handler(route.get_route_handler()))
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    app.add_middleware(ProfilingMiddleware)
@@ -0,0 +1,130 @@
+import os
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+# Rotas GET cujas requisições concorrentes e idênticas compartilham uma única execução
+# (mesma rota, mesmos parâmetros e mesmo escopo de autenticação).
+# Pode ser sobrescrito com COALESCED_ROUTES="/suppliers/{supplier_id},/orders/"
+COALESCED_ROUTES = _env_list("COALESCED_ROUTES", [
+    "/suppliers/{supplier_id}",
+    "/suppliers/",
+    "/orders/{order_id}",
+    "/orders/",
+])
+
+# Rotas POST que aceitam o cabeçalho Idempotency-Key
+IDEMPOTENT_ROUTES = _env_list("IDEMPOTENT_ROUTES", ["/orders/", "/users/", "/suppliers/"])
+# Tempo (segundos) que uma resposta armazenada pode ser reaproveitada
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 24 * 60 * 60))
+# Tempo máximo (segundos) que uma requisição duplicada aguarda a original terminar
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 30))
+# Tempo (segundos) após o qual uma requisição original ainda "em andamento" é considerada
+# abandonada (ex.: o processo caiu) e a chave pode ser retomada. Deve ser maior que a
+# duração da rota mais lenta, para que uma requisição lenta não seja executada duas vezes.
+IDEMPOTENCY_LOCK_TIMEOUT = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", 5 * 60))
+# Intervalo mínimo (segundos) entre limpezas das chaves expiradas
+IDEMPOTENCY_CLEANUP_INTERVAL = int(os.getenv("IDEMPOTENCY_CLEANUP_INTERVAL", 10 * 60))
+
+# Intervalo máximo (segundos) entre leituras do log de mudanças de pedidos.
+# Escritas feitas neste processo acordam o leitor imediatamente.
+CHANGE_FEED_POLL_INTERVAL = float(os.getenv("CHANGE_FEED_POLL_INTERVAL", 1))
+# Quantidade de mudanças recentes mantidas em memória para os assinantes
+CHANGE_FEED_BUFFER_SIZE = int(os.getenv("CHANGE_FEED_BUFFER_SIZE", 10000))
+# Tempo máximo (segundos) de espera de um long-poll em GET /orders/changes
+CHANGE_FEED_MAX_WAIT = float(os.getenv("CHANGE_FEED_MAX_WAIT", 30))
+# Intervalo (segundos) entre mensagens de keep-alive no stream SSE
+CHANGE_FEED_HEARTBEAT = float(os.getenv("CHANGE_FEED_HEARTBEAT", 15))
+
+# Arquivamento de pedidos: status finais e idade mínima (dias desde a última atualização)
+ARCHIVE_TERMINAL_STATUSES = _env_list("ARCHIVE_TERMINAL_STATUSES", ["Delivered", "Cancelled"])
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 90))
+# Pedidos movidos por transação (mantém cada transação curta)
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", 500))
+# Lotes por chamada de POST /admin/orders/archive (limita o tempo de cada requisição)
+ARCHIVE_MAX_BATCHES = int(os.getenv("ARCHIVE_MAX_BATCHES", 10))
+
+# Tempo (segundos) que o total de uma listagem com filtros fica em cache
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", 5))
+# Linhas mais recentes usadas para estimar o total de uma listagem com filtros (count=estimate)
+COUNT_SAMPLE_SIZE = int(os.getenv("COUNT_SAMPLE_SIZE", 1000))
+
+# Servidor de produção (serve.py)
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", 8000))
+# Número de processos de trabalho; padrão: um por CPU
+WORKERS = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+
+# Modo de journal do SQLite. WAL permite leituras simultâneas às escritas; vazio mantém o modo do arquivo.
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+# Pool de conexões: tamanho, conexões extras permitidas e espera máxima (segundos) por uma
+# conexão. A espera é curta: com o pool esgotado a requisição recebe 503 com Retry-After.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 1))
+
+# Threads disponíveis para as rotas síncronas (padrão do AnyIO: 40)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 40))
+# Controle de admissão: requisições em execução simultânea, fila máxima e espera máxima
+# (segundos) na fila antes de responder 503 com Retry-After. Por padrão, não admite mais
+# requisições do que há threads ou conexões no pool.
+ADMISSION_MAX_CONCURRENCY = int(os.getenv(
+    "ADMISSION_MAX_CONCURRENCY", min(THREADPOOL_SIZE, DB_POOL_SIZE + DB_MAX_OVERFLOW)
+))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 100))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 1))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 1))
+# Prefixos de rotas fora do controle de admissão (conexões longas e administração)
+ADMISSION_EXEMPT_PATHS = _env_list("ADMISSION_EXEMPT_PATHS", ["/orders/changes", "/admin"])
+
+# Rotas /admin: exigem o cabeçalho "X-Admin-Token: <ADMIN_TOKEN>". Sem ADMIN_TOKEN
+# configurado elas ficam indisponíveis (403).
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Manutenção do banco: executada em segundo plano nos períodos sem requisições
+MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Intervalo (segundos) entre verificações de tarefas pendentes
+MAINTENANCE_CHECK_INTERVAL = float(os.getenv("MAINTENANCE_CHECK_INTERVAL", 30))
+# Segundos sem requisições para considerar o processo ocioso. Uma tarefa atrasada
+# em mais de um intervalo é executada mesmo sem período ocioso.
+MAINTENANCE_QUIET_SECONDS = float(os.getenv("MAINTENANCE_QUIET_SECONDS", 5))
+# Intervalo (segundos) de cada tarefa; 0 desativa a execução automática
+MAINTENANCE_INTERVALS = {
+    "optimize": int(os.getenv("MAINTENANCE_OPTIMIZE_INTERVAL", 60 * 60)),
+    "incremental_vacuum": int(os.getenv("MAINTENANCE_VACUUM_INTERVAL", 60 * 60)),
+    "checkpoint": int(os.getenv("MAINTENANCE_CHECKPOINT_INTERVAL", 5 * 60)),
+    "backup": int(os.getenv("MAINTENANCE_BACKUP_INTERVAL", 24 * 60 * 60)),
+    "archive_orders": int(os.getenv("MAINTENANCE_ARCHIVE_INTERVAL", 24 * 60 * 60)),
+    "enable_incremental_vacuum": 0,
+}
+# Páginas liberadas por execução do incremental vacuum
+MAINTENANCE_VACUUM_PAGES = int(os.getenv("MAINTENANCE_VACUUM_PAGES", 1000))
+# Tempo (segundos) após o qual uma tarefa ainda "running" é considerada abandonada (ex.: o
+# processo caiu) e pode ser executada de novo. Deve ser maior que a duração da tarefa mais lenta.
+MAINTENANCE_RUN_TIMEOUT = int(os.getenv("MAINTENANCE_RUN_TIMEOUT", 60 * 60))
+# Backups: diretório (padrão: database/backups), quantidade mantida e tamanho/pausa de cada passo
+BACKUP_DIR = os.getenv("BACKUP_DIR", "")
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", 7))
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", 256))
+BACKUP_STEP_SLEEP = float(os.getenv("BACKUP_STEP_SLEEP", 0.05))
+
+# Importação de CSV: linhas validadas e inseridas por transação, erros detalhados
+# no relatório e processos usados para o hash das senhas (padrão: número de CPUs)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 500))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", 100))
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", 0)) or os.cpu_count() or 1
+
+# Perfilamento de requisições (desativado por padrão, sem nenhum custo quando desativado).
+# Com PROFILE_ENABLED, requisições com o cabeçalho "X-Profile: <ADMIN_TOKEN>" recebem os
+# tempos no cabeçalho Server-Timing; PROFILE_SAMPLE_RATE perfila uma fração (0 a 1) de todas
+# as requisições. Os perfis são gravados em PROFILE_DIR ("" para não gravar).
+PROFILE_ENABLED = os.getenv("PROFILE_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# Intervalo (segundos) entre amostras de pilha das requisições perfiladas
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
@@ -0,0 +1,22 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Perfil da requisição atual (app.profiling.Profile), definido pelo ProfilingMiddleware.
+# Fica em um módulo sem dependências para que modelos e utilitários possam registrar
+# spans sem importar o perfilamento (FastAPI, SQLAlchemy e o engine do banco).
+_current_profile = ContextVar("profile", default=None)
+
+
+@contextmanager
+def span(name: str, detail: str = None):
+    """Registra a duração do bloco no perfil da requisição atual, se houver um."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, start, time.perf_counter(), detail)
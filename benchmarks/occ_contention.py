@@ -0,0 +1,86 @@
+"""
+Benchmark de contenção do controle de concorrência otimista em pedidos.
+
+Vários escritores incrementam a quantidade do mesmo pedido (ler -> modificar -> gravar).
+No modo "occ" cada gravação é condicional à versão lida e é repetida em caso de conflito;
+no modo "blind" a gravação ignora a versão, como antes, e perde atualizações.
+
+Uso:
+    python -m benchmarks.occ_contention --writers 16 --updates 50
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from crud.orders import create_order, get_order, update_order
+from crud.versioning import VersionConflictError
+from database.migrations import migrate
+from models.model import Order
+from schemas.schema import OrderCreate, OrderUpdate
+
+
+def run(mode: str, writers: int, updates: int, path: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    migrate(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with Session() as db:
+        order_id = create_order(db, OrderCreate(
+            product_type="bench", quantity=0, status="Pending", user_id=1, supplier_id=1
+        )).id
+
+    conflicts = 0
+    lock = threading.Lock()
+
+    def writer():
+        nonlocal conflicts
+        with Session() as db:
+            for _ in range(updates):
+                while True:
+                    db_order = db.get(Order, order_id, populate_existing=True)
+                    expected = db_order.version if mode == "occ" else None
+                    try:
+                        update_order(db, order_id, OrderUpdate(quantity=db_order.quantity + 1), expected)
+                        break
+                    except VersionConflictError:
+                        with lock:
+                            conflicts += 1
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with Session() as db:
+        final = get_order(db, order_id).quantity
+    engine.dispose()
+
+    total = writers * updates
+    print(
+        f"{mode:>5}: {total} atualizações em {elapsed:.2f}s "
+        f"({total / elapsed:.0f}/s), conflitos={conflicts}, "
+        f"quantidade final={final} (perdidas={total - final})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+
+    for mode in ("blind", "occ"):
+        with tempfile.TemporaryDirectory() as directory:
+            run(mode, args.writers, args.updates, os.path.join(directory, "bench.db"))
+
+
+if __name__ == "__main__":
+    main()
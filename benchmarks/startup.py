@@ -0,0 +1,79 @@
+"""
+Benchmark do tempo de inicialização de um worker.
+
+Compara um worker que importa e cria a aplicação do zero (processo novo, como nos
+workers do uvicorn) com um worker criado por fork a partir de um processo que já
+carregou a aplicação (como em serve.py).
+
+Uso:
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import uvicorn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_START = (
+    "import time; start = time.perf_counter(); "
+    "from app.api import create_app; import uvicorn; "
+    "uvicorn.Config(create_app()).load(); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def cold_start() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def forked_start(app) -> float:
+    read_fd, write_fd = os.pipe()
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        uvicorn.Config(app).load()
+        asyncio.run(asyncio.sleep(0))
+        os.write(write_fd, b"1")
+        os._exit(0)
+    os.close(write_fd)
+    os.read(read_fd, 1)
+    elapsed = time.perf_counter() - start
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    return elapsed
+
+
+def report(name: str, samples: list):
+    print(f"{name:>6}: mediana {statistics.median(samples) * 1000:.1f} ms, "
+          f"mín {min(samples) * 1000:.1f} ms, máx {max(samples) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    report("cold", [cold_start() for _ in range(args.runs)])
+
+    if not hasattr(os, "fork"):
+        print("  fork: indisponível neste sistema")
+        return
+    sys.path.insert(0, ROOT)
+    from app.api import create_app
+
+    app = create_app()
+    report("fork", [forked_start(app) for _ in range(args.runs)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+# Registra os eventos que mantêm os totais das tabelas (ver counters.py)
+# e o log de mudanças de pedidos (ver order_changes.py)
+from crud import counters, order_changes
@@ -0,0 +1,103 @@
+import time
+from collections import Counter
+from sqlalchemy import and_, case, event, exists, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
+from models.model import Address, Order, OrderArchive, Supplier, TableCounter, User
+
+# Tabelas com total mantido em "table_counters"
+COUNTED_MODELS = [User, Supplier, Order, OrderArchive, Address]
+
+# Chave em `Session.info` com as variações de total acumuladas durante o flush
+DELTAS_KEY = "table_counter_deltas"
+
+# Cache dos totais de listagens com filtros: chave -> (expira_em, total)
+_count_cache = {}
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+def _track(delta: int):
+    def listener(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault(DELTAS_KEY, Counter())[target.__tablename__] += delta
+    return listener
+
+for _model in COUNTED_MODELS:
+    event.listen(_model, "after_insert", _track(1))
+    event.listen(_model, "after_delete", _track(-1))
+
+@event.listens_for(Session, "after_flush")
+def _apply_deltas(session, flush_context):
+    # Um UPDATE por tabela alterada, na mesma transação das inserções/exclusões (inclusive em cascata)
+    deltas = session.info.pop(DELTAS_KEY, None)
+    for table, delta in (deltas or {}).items():
+        if delta:
+            adjust_table_count(session, table, delta)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_deltas(session, previous_transaction):
+    session.info.pop(DELTAS_KEY, None)
+
+def adjust_table_count(db: Session, table: str, delta: int):
+    """Ajusta o total da tabela. Necessário apenas em escritas em massa (insert/delete do Core)."""
+    db.connection().execute(
+        update(TableCounter).where(TableCounter.name == table).values(count=TableCounter.count + delta)
+    )
+
+def get_table_count(db: Session, model):
+    table = model.__tablename__
+    count = db.query(TableCounter.count).filter(TableCounter.name == table).scalar()
+    if count is not None:
+        return count
+    # Primeiro uso: inicializa o contador com COUNT(*) em uma única instrução
+    try:
+        db.execute(insert(TableCounter).from_select(
+            ["name", "count"],
+            select(literal(table), func.count()).select_from(model)
+            .where(~exists().where(TableCounter.name == table))
+        ))
+        db.commit()
+    except IntegrityError:
+        # Outra requisição inicializou o contador ao mesmo tempo
+        db.rollback()
+    return db.query(TableCounter.count).filter(TableCounter.name == table).scalar()
+
+def _sample_estimate(db: Session, model, filters: dict, sample_size: int):
+    # Proporção de linhas que atendem aos filtros entre as `sample_size` mais recentes
+    sample = select(model).order_by(model.id.desc()).limit(sample_size).subquery()
+    conditions = [sample.c[name] == value for name, value in filters.items()]
+    sampled, matched = db.execute(select(
+        func.count(),
+        func.coalesce(func.sum(case((and_(*conditions), 1), else_=0)), 0)
+    ).select_from(sample)).one()
+    if sampled < sample_size:
+        return matched
+    return round(get_table_count(db, model) * matched / sampled)
+
+def count_rows(db: Session, model, filters: dict = None, mode: str = "exact", ttl: float = 5, sample_size: int = 1000):
+    """
+    Retorna (total, estimado) das linhas de `model` que atendem aos filtros de igualdade.
+
+    Sem filtros, o total vem de "table_counters". Com filtros, vem de um COUNT(*) mantido
+    em cache por `ttl` segundos; com mode="estimate", um total em cache vencido é aceito ou,
+    na falta dele, o total é estimado a partir de uma amostra das linhas mais recentes.
+    """
+    filters = {name: value for name, value in (filters or {}).items() if value is not None}
+    if not filters:
+        return get_table_count(db, model), False
+
+    key = (model.__tablename__, tuple(sorted(filters.items())))
+    now = time.monotonic()
+    cached = _count_cache.get(key)
+    if cached is not None and cached[0] > now:
+        return cached[1], False
+    if mode == "estimate":
+        if cached is not None:
+            return cached[1], True
+        return _sample_estimate(db, model, filters, sample_size), True
+
+    total = db.query(func.count()).select_from(model).filter_by(**filters).scalar()
+    if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[key] = (now + ttl, total)
+    return total, False
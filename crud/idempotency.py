@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.model import IdempotencyKey
+
+def get_idempotency_key(db: Session, key: str):
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at >= datetime.now()
+    ).first()
+
+def claim_idempotency_key(db: Session, key: str, request_hash: str, ttl: timedelta, lock_timeout: timedelta):
+    """
+    Registra a chave como "em andamento". Retorna o `created_at` do registro, que identifica
+    esta requisição como dona da chave, ou None se outra requisição já a registrou.
+
+    Registros expirados e registros em andamento mais antigos que `lock_timeout`
+    (ex.: o processo caiu no meio da requisição) são descartados e a chave pode ser retomada.
+    """
+    now = datetime.now()
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        or_(
+            IdempotencyKey.expires_at < now,
+            IdempotencyKey.status_code.is_(None) & (IdempotencyKey.created_at < now - lock_timeout)
+        )
+    ).delete(synchronize_session=False)
+    db.add(IdempotencyKey(key=key, request_hash=request_hash, created_at=now, expires_at=now + ttl))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return now
+
+def _owned_claim(db: Session, key: str, claimed_at: datetime):
+    # Registro "em andamento" criado por esta requisição (e não retomado por outra)
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        IdempotencyKey.created_at == claimed_at,
+        IdempotencyKey.status_code.is_(None)
+    )
+
+def complete_idempotency_key(db: Session, key: str, claimed_at: datetime, status_code: int, content_type: str,
+                             headers: str, body: bytes):
+    """
+    Armazena a resposta. Retorna False, sem alterar nada, se a chave foi retomada por outra
+    requisição depois de `lock_timeout`: a resposta desta não deve sobrescrever a da outra.
+    """
+    updated = _owned_claim(db, key, claimed_at).update(
+        {"status_code": status_code, "content_type": content_type, "headers": headers, "body": body},
+        synchronize_session=False
+    )
+    db.commit()
+    return updated == 1
+
+def release_idempotency_key(db: Session, key: str, claimed_at: datetime):
+    _owned_claim(db, key, claimed_at).delete(synchronize_session=False)
+    db.commit()
+
+def delete_expired_idempotency_keys(db: Session):
+    deleted = db.query(IdempotencyKey).filter(
+        IdempotencyKey.expires_at < datetime.now()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -0,0 +1,132 @@
+import csv
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.passwords import hash_passwords
+
+def _new_report():
+    return {
+        "processed": 0,
+        "created": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "errors": [],
+        "errors_truncated": False,
+    }
+
+def _add_error(report: dict, max_errors: int, line: int, message: str):
+    if len(report["errors"]) < max_errors:
+        report["errors"].append({"line": line, "message": message})
+    else:
+        report["errors_truncated"] = True
+
+def _format_validation_error(exc: ValidationError):
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+def _parse_row(schema, row: dict):
+    # Colunas extras (chave None) são ignoradas e valores vazios viram None
+    values = {
+        name.strip(): (value.strip() or None) if isinstance(value, str) else value
+        for name, value in row.items() if name is not None
+    }
+    return schema.model_validate(values)
+
+def _first_line(reader: csv.DictReader, row: dict):
+    # Depois da leitura, `line_num` aponta para a linha em que o registro termina; campos
+    # entre aspas com quebras de linha fazem o registro começar antes dela
+    values = [value for value in row.values() if isinstance(value, str)]
+    values += [value for extra in row.values() if isinstance(extra, list) for value in extra]
+    return reader.line_num - sum(value.count("\n") for value in values)
+
+def _read_chunks(reader: csv.DictReader, size: int):
+    # Gera listas de (linha em que o registro começa, registro) com até `size` registros
+    while True:
+        chunk = [(_first_line(reader, row), row) for row in islice(reader, size)]
+        if not chunk:
+            return
+        yield chunk
+
+def _insert(db: Session, objects: list, report: dict, max_errors: int):
+    db.add_all(obj for _, obj in objects)
+    try:
+        db.commit()
+        report["created"] += len(objects)
+        return
+    except IntegrityError:
+        db.rollback()
+    # Outra requisição inseriu um dos registros ao mesmo tempo: insere um a um
+    for line, obj in objects:
+        db.add(obj)
+        try:
+            db.commit()
+            report["created"] += 1
+        except IntegrityError:
+            db.rollback()
+            report["duplicates"] += 1
+            _add_error(report, max_errors, line, "Registro já existente")
+
+def import_rows(db: Session, model, schema, reader: csv.DictReader, unique_fields: tuple, build,
+                chunk_size: int = 500, max_errors: int = 100):
+    """
+    Importa os registros de um CSV em lotes de `chunk_size` linhas, uma transação por lote.
+
+    Cada linha é validada com `schema`; linhas repetidas no arquivo ou já cadastradas
+    (em qualquer campo de `unique_fields`, verificados com um `IN` por campo e lote)
+    são rejeitadas. As senhas do lote são hasheadas em paralelo e `build(item, hash)`
+    cria o objeto a ser inserido.
+
+    Retorna o relatório com os totais e até `max_errors` erros (linha e mensagem).
+    """
+    report = _new_report()
+    chunks = _read_chunks(reader, chunk_size)
+    while True:
+        try:
+            chunk = next(chunks, None)
+        except (csv.Error, UnicodeDecodeError) as exc:
+            # Arquivo malformado: os lotes anteriores já foram gravados e o atual é descartado
+            _add_error(report, max_errors, reader.line_num, f"Arquivo inválido: {exc}")
+            return report
+        if chunk is None:
+            return report
+
+        report["processed"] += len(chunk)
+        seen = {field: set() for field in unique_fields}
+        items = []
+        for line, row in chunk:
+            try:
+                item = _parse_row(schema, row)
+            except ValidationError as exc:
+                report["invalid"] += 1
+                _add_error(report, max_errors, line, _format_validation_error(exc))
+                continue
+            repeated = next((field for field in unique_fields if getattr(item, field) in seen[field]), None)
+            if repeated:
+                report["duplicates"] += 1
+                _add_error(report, max_errors, line, f"{repeated} repetido no arquivo")
+                continue
+            for field in unique_fields:
+                seen[field].add(getattr(item, field))
+            items.append((line, item))
+
+        existing = {
+            field: set(db.scalars(select(getattr(model, field)).where(getattr(model, field).in_(values))))
+            for field, values in seen.items() if values
+        }
+        new_items = []
+        for line, item in items:
+            registered = next((field for field in unique_fields if getattr(item, field) in existing.get(field, ())), None)
+            if registered:
+                report["duplicates"] += 1
+                _add_error(report, max_errors, line, f"{registered} já registrado")
+                continue
+            new_items.append((line, item))
+        if not new_items:
+            continue
+
+        hashes = hash_passwords([item.password for _, item in new_items])
+        objects = [(line, build(item, password)) for (line, item), password in zip(new_items, hashes)]
+        _insert(db, objects, report, max_errors)
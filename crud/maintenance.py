@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.model import MaintenanceRun
+
+def get_maintenance_runs(db: Session):
+    return {run.task: run for run in db.query(MaintenanceRun).all()}
+
+def claim_maintenance_run(db: Session, task: str, run_timeout: timedelta, interval: timedelta = None):
+    """
+    Marca a tarefa como "running" se ela estiver pendente. Retorna False se outra
+    execução (de qualquer processo) já a iniciou.
+
+    Uma execução "running" iniciada há mais de `run_timeout` é considerada abandonada
+    (ex.: o processo caiu) e pode ser retomada. Com `interval`, a tarefa também só é
+    iniciada se a última execução começou há mais tempo que o intervalo.
+    """
+    if db.get(MaintenanceRun, task) is None:
+        db.add(MaintenanceRun(task=task))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+
+    now = datetime.now()
+    statement = update(MaintenanceRun).where(
+        MaintenanceRun.task == task,
+        or_(
+            MaintenanceRun.status.is_(None),
+            MaintenanceRun.status != "running",
+            MaintenanceRun.last_started_at.is_(None),
+            MaintenanceRun.last_started_at < now - run_timeout
+        )
+    )
+    if interval is not None:
+        statement = statement.where(or_(
+            MaintenanceRun.last_started_at.is_(None),
+            MaintenanceRun.last_started_at < now - interval
+        ))
+    claimed = db.execute(statement.values(last_started_at=now, status="running")).rowcount == 1
+    db.commit()
+    return claimed
+
+def finish_maintenance_run(db: Session, task: str, status: str, detail: str, duration: float):
+    db.execute(update(MaintenanceRun).where(MaintenanceRun.task == task).values(
+        status=status,
+        detail=detail,
+        last_finished_at=datetime.now(),
+        duration_seconds=duration
+    ))
+    db.commit()
\ No newline at end of file
@@ -0,0 +1,61 @@
+from datetime import datetime
+from sqlalchemy import DateTime, delete, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from models.model import Order, OrderArchive
+from crud.counters import adjust_table_count
+from crud.order_changes import record_order_changes
+
+ORDER_COLUMNS = [column.name for column in Order.__table__.columns]
+
+def get_archived_order(db: Session, order_id: int):
+    return db.query(OrderArchive).filter(OrderArchive.id == order_id).first()
+
+def get_all_orders_with_archive(db: Session, skip: int = 0, limit: int = 10, **filters):
+    """Lista pedidos ativos e arquivados juntos, ordenados por ID."""
+    filters = {name: value for name, value in filters.items() if value is not None}
+    hot = select(
+        *[Order.__table__.c[name] for name in ORDER_COLUMNS],
+        literal(None, DateTime).label("archived_at")
+    ).filter_by(**filters)
+    cold = select(
+        *[OrderArchive.__table__.c[name] for name in ORDER_COLUMNS],
+        OrderArchive.__table__.c.archived_at
+    ).filter_by(**filters)
+    statement = union_all(hot, cold).order_by("id").offset(skip).limit(limit)
+    return [dict(row) for row in db.execute(statement).mappings()]
+
+def _archivable_orders(db: Session, statuses: list, older_than: datetime):
+    return db.query(Order.id).filter(Order.status.in_(statuses), Order.updated_at < older_than)
+
+def has_orders_to_archive(db: Session, statuses: list, older_than: datetime):
+    return _archivable_orders(db, statuses, older_than).first() is not None
+
+def archive_orders(db: Session, statuses: list, older_than: datetime, batch_size: int = 500, max_batches: int = None):
+    """
+    Move os pedidos com status em `statuses` e sem atualização desde `older_than`
+    para "orders_archive", em lotes de até `batch_size` pedidos por transação. Cada
+    pedido arquivado gera uma mudança "archive" no log de pedidos, no mesmo lote.
+
+    Retorna o número de pedidos arquivados.
+    """
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = [row.id for row in _archivable_orders(db, statuses, older_than).order_by(Order.id).limit(batch_size)]
+        if not ids:
+            break
+        db.execute(insert(OrderArchive).from_select(
+            ORDER_COLUMNS + ["archived_at"],
+            select(*[Order.__table__.c[name] for name in ORDER_COLUMNS], literal(datetime.now(), DateTime))
+            .where(Order.id.in_(ids))
+        ))
+        # INSERT ... SELECT e DELETE do Core não disparam os eventos do mapper de Order
+        archived_orders = db.execute(select(Order.__table__).where(Order.id.in_(ids))).all()
+        record_order_changes(db, archived_orders, "archive")
+        db.execute(delete(Order).where(Order.id.in_(ids)))
+        adjust_table_count(db, Order.__tablename__, -len(ids))
+        adjust_table_count(db, OrderArchive.__tablename__, len(ids))
+        db.commit()
+        archived += len(ids)
+        batches += 1
+    return archived
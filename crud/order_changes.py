@@ -0,0 +1,80 @@
+import json
+from datetime import datetime
+from sqlalchemy import event, func, insert
+from sqlalchemy.orm import Session, object_session
+from models.model import Order, OrderChange
+
+# Chave em `Session.info` que indica que a transação gravou mudanças de pedidos
+PENDING_CHANGES_KEY = "order_changes_pending"
+
+def _order_snapshot(order: Order):
+    snapshot = {}
+    for column in Order.__table__.columns:
+        value = getattr(order, column.name)
+        snapshot[column.name] = value.isoformat() if isinstance(value, datetime) else value
+    return snapshot
+
+def _change_values(order: Order, operation: str):
+    return {
+        "order_id": order.id,
+        "supplier_id": order.supplier_id,
+        "operation": operation,
+        "status": order.status,
+        "payload": json.dumps(_order_snapshot(order)),
+        "created_at": datetime.now(),
+    }
+
+def _insert_change(connection, order: Order, operation: str):
+    connection.execute(insert(OrderChange).values(**_change_values(order, operation)))
+
+def record_order_change(db: Session, order: Order, operation: str):
+    """
+    Registra a mudança no log de pedidos. Não faz commit: deve ir na mesma transação da escrita.
+    Necessário apenas em escritas que não passam pelo flush do ORM (ex.: UPDATE condicional).
+    """
+    _insert_change(db.connection(), order, operation)
+    db.info[PENDING_CHANGES_KEY] = True
+
+def record_order_changes(db: Session, orders: list, operation: str):
+    """
+    Igual a `record_order_change` para vários pedidos, em uma única instrução. `orders`
+    pode conter linhas do Core (ex.: pedidos movidos em lote para o arquivo).
+    """
+    if not orders:
+        return
+    db.execute(insert(OrderChange), [_change_values(order, operation) for order in orders])
+    db.info[PENDING_CHANGES_KEY] = True
+
+def _track(operation: str):
+    # Inserções, alterações e exclusões feitas pelo ORM, inclusive em cascata (ex.: ao excluir
+    # um fornecedor ou usuário), são registradas no mesmo flush e na mesma transação
+    def listener(mapper, connection, target):
+        _insert_change(connection, target, operation)
+        session = object_session(target)
+        if session is not None:
+            session.info[PENDING_CHANGES_KEY] = True
+    return listener
+
+event.listen(Order, "after_insert", _track("create"))
+event.listen(Order, "after_update", _track("update"))
+event.listen(Order, "after_delete", _track("delete"))
+
+def change_to_dict(change: OrderChange):
+    return {
+        "seq": change.seq,
+        "order_id": change.order_id,
+        "supplier_id": change.supplier_id,
+        "operation": change.operation,
+        "status": change.status,
+        "order": json.loads(change.payload) if change.payload else None,
+        "created_at": change.created_at,
+    }
+
+def get_order_changes_since(db: Session, since: int, supplier_id: int = None, limit: int = 100):
+    query = db.query(OrderChange).filter(OrderChange.seq > since)
+    if supplier_id is not None:
+        query = query.filter(OrderChange.supplier_id == supplier_id)
+    return [change_to_dict(change) for change in query.order_by(OrderChange.seq).limit(limit).all()]
+
+def get_last_order_change_seq(db: Session):
+    return db.query(func.max(OrderChange.seq)).scalar() or 0
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session
 from models.model import Order
 from schemas.schema import *
+from crud.order_changes import record_order_change
+from crud.versioning import conditional_update
 
 def create_order(db: Session, order: OrderCreate):
     db_order = Order(
@@ -18,15 +20,19 @@ def create_order(db: Session, order: OrderCreate):
 def get_order(db: Session, order_id: int):
     return db.query(Order).filter(Order.id == order_id).first()
 
-def get_all_orders(db: Session, skip: int = 0, limit: int = 10):
-    return db.query(Order).offset(skip).limit(limit).all()
+def get_all_orders(db: Session, skip: int = 0, limit: int = 10, **filters):
+    filters = {name: value for name, value in filters.items() if value is not None}
+    return db.query(Order).filter_by(**filters).offset(skip).limit(limit).all()
 
-def update_order(db: Session, order_id: int, order: OrderUpdate):
-    db_order = get_order(db, order_id=order_id)
+def update_order(db: Session, order_id: int, order: OrderUpdate, expected_version: int = None):
+    if expected_version is None:
+        expected_version = order.version
+    values = order.model_dump(exclude_unset=True, exclude={"version"})
+    db_order = conditional_update(db, Order, order_id, values, expected_version)
     if db_order is None:
         return None
-    for key, value in order.model_dump(exclude_unset=True).items():
-        setattr(db_order, key, value)
+    # O UPDATE condicional não passa pelo flush do ORM (e pelos eventos de crud/order_changes.py)
+    record_order_change(db, db_order, "update")
     db.commit()
     db.refresh(db_order)
     return db_order
@@ -1,6 +1,10 @@
 from sqlalchemy.orm import Session
-from models.model import Address, Supplier
+from models.model import Supplier
 from schemas.schema import *
+from crud.imports import import_rows
+from app.passwords import hash_password
+from app.timing import span
+from crud.versioning import conditional_update
 
 def create_supplier(db: Session, supplier: SupplierCreate):
     db_supplier = Supplier(
@@ -21,12 +25,18 @@ def get_supplier(db: Session, supplier_id: int):
 def get_all_suppliers(db: Session, skip: int = 0, limit: int = 10):
     return db.query(Supplier).offset(skip).limit(limit).all()
 
-def update_supplier(db: Session, supplier_id: int, supplier: SupplierUpdate):
-    db_supplier = get_supplier(db, supplier_id=supplier_id)
+def update_supplier(db: Session, supplier_id: int, supplier: SupplierUpdate, expected_version: int = None):
+    if expected_version is None:
+        expected_version = supplier.version
+    values = supplier.model_dump(exclude_unset=True, exclude={"version"})
+    # A senha nunca é gravada em texto puro: o UPDATE condicional não passa por set_password
+    password = values.pop("password", None)
+    if password is not None:
+        with span("bcrypt", "hashpw"):
+            values["password"] = hash_password(password)
+    db_supplier = conditional_update(db, Supplier, supplier_id, values, expected_version)
     if db_supplier is None:
         return None
-    for key, value in supplier.model_dump(exclude_unset=True).items():
-        setattr(db_supplier, key, value)
     db.commit()
     db.refresh(db_supplier)
     return db_supplier
@@ -37,4 +47,15 @@ def delete_supplier(db: Session, supplier_id: int):
         return None
     db.delete(db_supplier)
     db.commit()
-    return db_supplier
\ No newline at end of file
+    return db_supplier
+
+def import_suppliers(db: Session, reader, chunk_size: int = 500, max_errors: int = 100):
+    def build(supplier: SupplierCreate, password_hash: str):
+        return Supplier(
+            name=supplier.name,
+            email=supplier.email,
+            cnpj=supplier.cnpj,
+            phone=supplier.phone,
+            password=password_hash
+        )
+    return import_rows(db, Supplier, SupplierCreate, reader, ("cnpj", "email"), build, chunk_size, max_errors)
\ No newline at end of file
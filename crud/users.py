@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
-from models.model import Address, User
+from models.model import Address, Role, User, UserRole
 from schemas.schema import *
+from crud.imports import import_rows
 
 def create_user(db: Session, user: UserCreate):
     db_user = User(
@@ -41,4 +42,23 @@ def delete_user(db: Session, user_id: int):
         return None
     db.delete(db_user)
     db.commit()
-    return db_user
\ No newline at end of file
+    return db_user
+
+def import_users(db: Session, reader, chunk_size: int = 500, max_errors: int = 100):
+    default_role = db.query(Role).filter(Role.name == "user").first()
+    if not default_role:
+        default_role = Role(name="user")
+        db.add(default_role)
+        db.commit()
+
+    def build(user: UserCreate, password_hash: str):
+        # Mesmo papel padrão de create_user, inserido no mesmo lote
+        return User(
+            name=user.name,
+            email=user.email,
+            phone=user.phone,
+            cpf=user.cpf,
+            password=password_hash,
+            roles=[UserRole(role=default_role)]
+        )
+    return import_rows(db, User, UserCreate, reader, ("cpf", "email"), build, chunk_size, max_errors)
\ No newline at end of file
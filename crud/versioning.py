@@ -0,0 +1,32 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+class VersionConflictError(Exception):
+    """O registro foi alterado por outra requisição depois da versão informada."""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Versão atual do registro: {current_version}")
+        self.current_version = current_version
+
+def conditional_update(db: Session, model, record_id: int, values: dict, expected_version: int = None):
+    """
+    Atualiza o registro e incrementa a versão em uma única instrução:
+
+        UPDATE ... SET ..., version = version + 1 WHERE id = :id [AND version = :expected_version]
+
+    Retorna o registro atualizado (sem commit), None se ele não existir, ou lança
+    VersionConflictError se a versão no banco for diferente de `expected_version`.
+    """
+    statement = update(model).where(model.id == record_id)
+    if expected_version is not None:
+        statement = statement.where(model.version == expected_version)
+    statement = statement.values(**values, version=model.version + 1, updated_at=datetime.now())
+    result = db.execute(statement.execution_options(synchronize_session=False))
+    if result.rowcount == 0:
+        current_version = db.query(model.version).filter(model.id == record_id).scalar()
+        db.rollback()
+        if current_version is None:
+            return None
+        raise VersionConflictError(current_version)
+    return db.get(model, record_id, populate_existing=True)
@@ -1,7 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+from app.settings import DB_JOURNAL_MODE, DB_MAX_OVERFLOW, DB_POOL_SIZE, DB_POOL_TIMEOUT
 
 # SQLALCHEMY_DATABASE_URL = "postgresql://root@localhost:8000/optics"
 
@@ -13,7 +14,21 @@ import os
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'optics.db')}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT
+)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if DB_JOURNAL_MODE:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={DB_JOURNAL_MODE}")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -24,3 +39,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Executa func(db, *args) com uma sessão própria (para uso fora das rotas, ex.: middlewares)
+def run_with_session(func, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return func(db, *args, **kwargs)
+    finally:
+        db.close()
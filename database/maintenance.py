@@ -0,0 +1,90 @@
+import glob
+import os
+import sqlite3
+from datetime import datetime
+from database.database import BASE_DIR, engine
+
+# Tarefas de manutenção do arquivo SQLite. Cada função retorna uma descrição do que foi feito.
+
+def optimize(bind=engine):
+    """Atualiza as estatísticas do planejador de consultas (ANALYZE na primeira vez, depois PRAGMA optimize)."""
+    with bind.connect() as connection:
+        analyzed = connection.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).first()
+        statement = "PRAGMA optimize" if analyzed else "ANALYZE"
+        connection.exec_driver_sql(statement)
+        connection.commit()
+    return statement
+
+def _pragma(connection, name: str):
+    return connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+def incremental_vacuum(pages: int, bind=engine):
+    """Devolve ao sistema até `pages` páginas livres. Requer auto_vacuum=INCREMENTAL."""
+    # Conexão do driver: executescript executa a instrução até o fim, enquanto execute
+    # avança um único passo (e o incremental_vacuum libera uma página por passo)
+    connection = bind.raw_connection()
+    try:
+        free_before = _pragma(connection.driver_connection, "freelist_count")
+        if _pragma(connection.driver_connection, "auto_vacuum") != 2:
+            return f"ignorado: auto_vacuum não está em INCREMENTAL ({free_before} páginas livres)"
+        connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+        free_after = _pragma(connection.driver_connection, "freelist_count")
+    finally:
+        connection.close()
+    return f"{free_before - free_after} páginas liberadas, {free_after} restantes"
+
+def enable_incremental_vacuum(bind=engine):
+    """Ativa auto_vacuum=INCREMENTAL. Executa um VACUUM completo, que bloqueia o banco enquanto dura."""
+    connection = bind.raw_connection()
+    try:
+        if _pragma(connection.driver_connection, "auto_vacuum") == 2:
+            return "auto_vacuum já está em INCREMENTAL"
+        # executescript roda fora de transação, como o VACUUM exige
+        connection.driver_connection.executescript("PRAGMA auto_vacuum = INCREMENTAL; VACUUM")
+    finally:
+        connection.close()
+    return "auto_vacuum alterado para INCREMENTAL"
+
+def checkpoint(mode: str = "PASSIVE", bind=engine):
+    """Copia o WAL para o arquivo principal. PASSIVE não espera leitores nem escritores."""
+    with bind.connect() as connection:
+        journal_mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+        if journal_mode.lower() != "wal":
+            return f"ignorado: journal_mode={journal_mode}"
+        busy, log_pages, checkpointed = connection.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})").one()
+    detail = f"{checkpointed}/{log_pages} páginas do WAL copiadas"
+    return detail + " (parcial: banco ocupado)" if busy else detail
+
+def backup(directory: str, keep: int, pages_per_step: int, step_sleep: float, bind=engine):
+    """
+    Cria uma cópia do banco com a API de backup do SQLite.
+
+    A cópia é feita em passos de `pages_per_step` páginas com uma pausa de `step_sleep`
+    segundos entre eles, liberando o banco para os escritores a cada passo.
+    Mantém apenas os `keep` backups mais recentes.
+    """
+    directory = directory or os.path.join(BASE_DIR, "backups")
+    os.makedirs(directory, exist_ok=True)
+    # Microssegundos no nome: dois backups no mesmo segundo não se sobrescrevem,
+    # e a ordem alfabética continua sendo a cronológica
+    name = datetime.now().strftime("optics-%Y%m%d-%H%M%S-%f.db")
+    target = os.path.join(directory, name)
+    partial = target + ".partial"
+
+    source = bind.raw_connection()
+    try:
+        destination = sqlite3.connect(partial)
+        try:
+            source.driver_connection.backup(destination, pages=pages_per_step, sleep=step_sleep)
+        finally:
+            destination.close()
+    finally:
+        source.close()
+    os.replace(partial, target)
+
+    backups = sorted(glob.glob(os.path.join(directory, "optics-*.db")))
+    for old in backups[:-keep] if keep > 0 else []:
+        os.remove(old)
+    return f"{name} ({os.path.getsize(target)} bytes)"
\ No newline at end of file
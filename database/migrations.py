@@ -0,0 +1,80 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+from database.database import Base, engine
+
+# Colunas adicionadas depois que as tabelas já existiam em produção.
+# `create_all` não altera tabelas existentes, então elas são criadas aqui.
+# (tabela, coluna, definição SQL)
+ADDED_COLUMNS = [
+    ("orders", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("suppliers", "version", "INTEGER NOT NULL DEFAULT 1"),
+    ("idempotency_keys", "headers", "TEXT"),
+]
+
+# Tabelas recriadas com AUTOINCREMENT (o SQLite não permite alterá-lo em uma tabela existente),
+# com a tabela cujos IDs também não podem ser reutilizados: (tabela, tabela de arquivo)
+AUTOINCREMENT_TABLES = [
+    ("orders", "orders_archive"),
+]
+
+def _rebuild_with_autoincrement(bind, table):
+    """Recria a tabela com a definição atual do modelo, copiando as linhas, em uma única transação."""
+    columns = ", ".join(column.name for column in table.columns)
+    with bind.connect() as connection:
+        old_indexes = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table.name,)
+        ).scalars().all()
+    statements = [f"ALTER TABLE {table.name} RENAME TO {table.name}_old"]
+    statements += [f"DROP INDEX {name}" for name in old_indexes]
+    statements.append(str(CreateTable(table).compile(bind)))
+    statements += [str(CreateIndex(index).compile(bind)) for index in table.indexes]
+    statements.append(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_old")
+    statements.append(f"DROP TABLE {table.name}_old")
+    connection = bind.raw_connection()
+    try:
+        # executescript executa o BEGIN/COMMIT explícito, tornando a recriação atômica
+        connection.driver_connection.executescript("BEGIN; " + "; ".join(statements) + "; COMMIT;")
+    finally:
+        connection.close()
+
+def _reserve_archived_ids(connection, table, archive):
+    # Garante que a sequência do AUTOINCREMENT fique acima dos IDs já arquivados
+    max_archived = connection.execute(text(f"SELECT MAX(id) FROM {archive}")).scalar()
+    if max_archived is None:
+        return
+    updated = connection.execute(
+        text("UPDATE sqlite_sequence SET seq = MAX(seq, :seq) WHERE name = :name"),
+        {"seq": max_archived, "name": table}
+    ).rowcount
+    if not updated:
+        connection.execute(
+            text("INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"),
+            {"name": table, "seq": max_archived}
+        )
+
+def migrate(bind=engine):
+    """Cria as tabelas que faltam e adiciona as colunas novas às tabelas existentes."""
+    import models.model  # registra os modelos em Base.metadata
+
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        inspector = inspect(connection)
+        for table, column, definition in ADDED_COLUMNS:
+            existing = {info["name"] for info in inspector.get_columns(table)}
+            if column not in existing:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+
+    for table, archive in AUTOINCREMENT_TABLES:
+        with bind.connect() as connection:
+            sql = connection.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).scalar()
+        if "AUTOINCREMENT" not in sql.upper():
+            _rebuild_with_autoincrement(bind, Base.metadata.tables[table])
+        with bind.begin() as connection:
+            _reserve_archived_ids(connection, table, archive)
+
+
+if __name__ == "__main__":
+    migrate()
@@ -1,4 +1,7 @@
 import uvicorn
+from database.migrations import migrate
 
 if __name__ == "__main__":
+    # Ambiente de desenvolvimento. Em produção use serve.py.
+    migrate()
     uvicorn.run("app.api:app", host="localhost", port=8000, reload=True)
\ No newline at end of file
@@ -2,6 +2,7 @@ from sqlalchemy import *
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.database import Base
+from app.timing import span
 from datetime import datetime
 import bcrypt
 
@@ -13,8 +14,8 @@ class User(Base):
     phone = Column(String, nullable=True)
     cpf = Column(String, unique=True, index=True)
     password = Column(String)
-    created_at = Column(DateTime, default=datetime.now())
-    updated_at = Column(DateTime, default=datetime.now(), onupdate=datetime.now())
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     is_active = Column(Boolean, default=True)
     
     orders = relationship("Order", back_populates="user", cascade="all, delete-orphan")
@@ -22,10 +23,12 @@ class User(Base):
     roles = relationship("UserRole", back_populates="user", cascade="all, delete-orphan")
 
     def set_password(self, password):
-        self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        with span("bcrypt", "hashpw"):
+            self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
+        with span("bcrypt", "checkpw"):
+            return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
 
     def assign_default_role(self, session):
         # Verifica se o papel "user" já existe
@@ -49,33 +52,55 @@ class Supplier(Base):
     cnpj = Column(String, unique=True, index=True)
     phone = Column(String, nullable=True)
     password = Column(String)
-    created_at = Column(DateTime, default=datetime.now())
-    updated_at = Column(DateTime, default=datetime.now(), onupdate=datetime.now())
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     is_active = Column(Boolean, default=True)
+    # Incrementada a cada atualização (controle de concorrência otimista)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     orders = relationship("Order", back_populates="supplier", cascade="all, delete-orphan")
     addresses = relationship("Address", back_populates="supplier", cascade="all, delete-orphan")
 
     def set_password(self, password):
-        self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        with span("bcrypt", "hashpw"):
+            self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
+        with span("bcrypt", "checkpw"):
+            return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
 
 class Order(Base):
     __tablename__ = "orders"
+    # AUTOINCREMENT: um ID excluído ou arquivado nunca é reutilizado por um novo pedido
+    __table_args__ = {"sqlite_autoincrement": True}
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     supplier_id = Column(Integer, ForeignKey("suppliers.id"))
     product_type = Column(String)
     quantity = Column(Integer)
     status = Column(String, default="Pending")
-    created_at = Column(DateTime, default=datetime.now())
-    updated_at = Column(DateTime, default=datetime.now(), onupdate=datetime.now())
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Incrementada a cada atualização (controle de concorrência otimista)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     user = relationship("User", back_populates="orders")
     supplier = relationship("Supplier", back_populates="orders")
 
+class OrderArchive(Base):
+    # Pedidos em status final movidos de "orders" (ver crud/order_archive.py)
+    __tablename__ = "orders_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    supplier_id = Column(Integer, ForeignKey("suppliers.id"))
+    product_type = Column(String)
+    quantity = Column(Integer)
+    status = Column(String)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    archived_at = Column(DateTime, nullable=False)
+
 class Address(Base):
     __tablename__ = "addresses"
 
@@ -103,4 +128,47 @@ class UserRole(Base):
     role_id = Column(Integer, ForeignKey("roles.id"))
 
     user = relationship("User", back_populates="roles")
-    role = relationship("Role")
\ No newline at end of file
+    role = relationship("Role")
+
+class TableCounter(Base):
+    # Total de linhas por tabela, mantido na mesma transação das inserções e exclusões
+    # (ver crud/counters.py) para evitar COUNT(*) nas listagens
+    __tablename__ = "table_counters"
+    name = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class MaintenanceRun(Base):
+    # Última execução de cada tarefa de manutenção do banco (ver app/maintenance.py)
+    __tablename__ = "maintenance_runs"
+    task = Column(String, primary_key=True)
+    status = Column(String, nullable=True)  # Ex: "running", "ok", "error"
+    detail = Column(String, nullable=True)
+    last_started_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    # "<método> <rota> <escopo de autenticação> <Idempotency-Key>"
+    key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    # status_code nulo indica que a requisição original ainda está em andamento
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    # Cabeçalhos da resposta em JSON: [[nome, valor], ...]
+    headers = Column(Text, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class OrderChange(Base):
+    __tablename__ = "order_changes"
+    # AUTOINCREMENT garante que a sequência nunca é reutilizada
+    __table_args__ = {"sqlite_autoincrement": True}
+    seq = Column(Integer, primary_key=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    supplier_id = Column(Integer, nullable=True, index=True)
+    operation = Column(String, nullable=False)  # Ex: "create", "update", "delete", "archive"
+    status = Column(String, nullable=True)
+    payload = Column(Text, nullable=True)  # Estado do pedido em JSON
+    created_at = Column(DateTime, nullable=False)
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from app.pagination import CountMode, set_total_count
+from crud.counters import count_rows
 from database.database import get_db
+from models.model import Address
 from schemas.schema import AddressCreate, AddressUpdate, AddressInDB
 from crud.address import *
 
@@ -54,18 +57,29 @@ def read_address(address_id: int, db: Session = Depends(get_db)):
     response_model=list[AddressInDB],
     summary="Lista todos os endereços",
     description="Endpoint para listar todos os endereços cadastrados no sistema. "
-                "Permite paginação usando os parâmetros `skip` e `limit`.",
+                "Permite paginação usando os parâmetros `skip` e `limit`. "
+                "O total de registros é retornado no cabeçalho `X-Total-Count`.",
     response_description="Retorna uma lista de endereços."
 )
-def read_all_addresses(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+def read_all_addresses(
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    count: CountMode = "exact",
+    db: Session = Depends(get_db)
+):
     """
     Lista todos os endereços cadastrados.
 
     - **skip**: Número de registros a serem ignorados (para paginação).
     - **limit**: Número máximo de registros a serem retornados (para paginação).
+    - **count**: `exact` (padrão) ou `estimate` retornam o total de registros no cabeçalho
+      `X-Total-Count`; `none` não calcula o total.
 
     Retorna uma lista de endereços.
     """
+    if count != "none":
+        set_total_count(response, *count_rows(db, Address, mode=count))
     return get_all_addresses(db, skip=skip, limit=limit)
 
 @router.put(
@@ -0,0 +1,172 @@
+import hmac
+from datetime import datetime, timedelta
+from typing import Optional
+from anyio import to_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.orm import Session
+from app import settings
+from app.admission import admission
+from app.changefeed import change_feed
+from app.coalescing import coalescer
+from app.maintenance import maintenance
+from crud.maintenance import get_maintenance_runs
+from crud.order_archive import archive_orders, has_orders_to_archive
+from database.database import engine, get_db
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    # Sem ADMIN_TOKEN configurado as rotas de administração ficam fechadas
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Administração desativada (ADMIN_TOKEN não configurado)")
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode("latin-1"), settings.ADMIN_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(status_code=401, detail="Token de administração inválido")
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+@router.get(
+    "/coalescing",
+    response_model=dict,
+    summary="Estatísticas de agrupamento de requisições",
+    description="Endpoint para consultar as rotas com agrupamento (singleflight) ativo e "
+                "quantas requisições foram executadas ou agrupadas em cada uma.",
+    response_description="Retorna as rotas configuradas e os contadores por rota."
+)
+def read_coalescing_stats():
+    """
+    Retorna as estatísticas do agrupamento de requisições GET concorrentes.
+
+    - **routes**: Rotas com agrupamento ativo.
+    - **inflight**: Grupos de requisições em execução no momento.
+    - **counters**: Para cada rota, quantas requisições executaram a consulta (`executed`)
+      e quantas reaproveitaram uma execução em andamento (`coalesced`).
+    """
+    return coalescer.stats()
+
+@router.get(
+    "/changefeed",
+    response_model=dict,
+    summary="Estado do log de mudanças de pedidos",
+    description="Endpoint para consultar o leitor do log de mudanças de pedidos usado pelo "
+                "long-polling e pelo stream SSE.",
+    response_description="Retorna o estado do leitor e o total de leituras feitas no banco."
+)
+def read_changefeed_stats():
+    """
+    Retorna o estado do leitor de mudanças de pedidos.
+
+    - **running**: Se o leitor está ativo.
+    - **reads**: Leituras feitas no banco (uma por despertar, compartilhada por todos os assinantes).
+    - **last_seq**: Última sequência lida.
+    - **buffered**: Mudanças mantidas em memória.
+    """
+    return change_feed.stats()
+
+@router.post(
+    "/orders/archive",
+    response_model=dict,
+    summary="Arquiva pedidos antigos",
+    description="Endpoint para mover pedidos em status final e sem atualização há mais de "
+                "`older_than_days` dias para a tabela de arquivo, em até `max_batches` lotes.",
+    response_description="Retorna a quantidade de pedidos arquivados e se ainda restam pedidos a arquivar."
+)
+def archive_old_orders(
+    older_than_days: int = Query(settings.ARCHIVE_AFTER_DAYS, ge=0),
+    batch_size: int = Query(settings.ARCHIVE_BATCH_SIZE, ge=1),
+    max_batches: int = Query(settings.ARCHIVE_MAX_BATCHES, ge=1),
+    db: Session = Depends(get_db)
+):
+    """
+    Move pedidos antigos em status final (`ARCHIVE_TERMINAL_STATUSES`) para `orders_archive`.
+
+    - **older_than_days**: Idade mínima, em dias desde a última atualização.
+    - **batch_size**: Pedidos movidos por transação.
+    - **max_batches**: Número máximo de lotes nesta execução (padrão `ARCHIVE_MAX_BATCHES`).
+
+    Quando `more` é verdadeiro, ainda há pedidos a arquivar: basta chamar a rota novamente.
+    """
+    older_than = datetime.now() - timedelta(days=older_than_days)
+    archived = archive_orders(
+        db,
+        statuses=settings.ARCHIVE_TERMINAL_STATUSES,
+        older_than=older_than,
+        batch_size=batch_size,
+        max_batches=max_batches
+    )
+    more = has_orders_to_archive(db, settings.ARCHIVE_TERMINAL_STATUSES, older_than)
+    return {"archived": archived, "more": more}
+
+@router.get(
+    "/saturation",
+    response_model=dict,
+    summary="Indicadores de saturação",
+    description="Endpoint para consultar a ocupação do controle de admissão, do threadpool "
+                "das rotas síncronas e do pool de conexões do banco.",
+    response_description="Retorna os indicadores de saturação deste processo."
+)
+async def read_saturation():
+    """
+    Retorna os indicadores de saturação deste processo.
+
+    - **admission**: Requisições em execução e na fila (e as isentas em andamento), limites e totais
+      de rejeições (503).
+    - **threadpool**: Threads em uso e tarefas aguardando uma thread.
+    - **db_pool**: Conexões em uso, disponíveis e extras (overflow) do pool do banco.
+    """
+    limiter = to_thread.current_default_thread_limiter()
+    pool = engine.pool
+    return {
+        "admission": admission.stats(),
+        "threadpool": {
+            "size": limiter.total_tokens,
+            "busy": limiter.borrowed_tokens,
+            "waiting": limiter.statistics().tasks_waiting,
+        },
+        "db_pool": {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "timeout_seconds": pool.timeout(),
+        },
+    }
+
+@router.get(
+    "/maintenance",
+    response_model=dict,
+    summary="Estado da manutenção do banco",
+    description="Endpoint para consultar as tarefas de manutenção do banco (estatísticas, "
+                "vacuum, checkpoint do WAL, backup e arquivamento) e suas últimas execuções.",
+    response_description="Retorna o estado do agendador e de cada tarefa."
+)
+def read_maintenance(db: Session = Depends(get_db)):
+    """
+    Retorna o estado da manutenção do banco.
+
+    - **running**: Se o agendador está ativo neste processo.
+    - **idle_seconds**: Segundos sem requisições neste processo.
+    - **tasks**: Para cada tarefa, o intervalo, o atraso (se vencida) e o resultado da última
+      execução, feita por qualquer processo.
+    """
+    return maintenance.status(get_maintenance_runs(db))
+
+@router.post(
+    "/maintenance/{task}",
+    response_model=dict,
+    summary="Executa uma tarefa de manutenção",
+    description="Endpoint para executar imediatamente uma tarefa de manutenção do banco.",
+    response_description="Retorna o resultado da execução."
+)
+async def run_maintenance_task(task: str):
+    """
+    Executa uma tarefa de manutenção e aguarda o seu término.
+
+    - **task**: Nome da tarefa (`optimize`, `incremental_vacuum`, `checkpoint`, `backup`,
+      `archive_orders` ou `enable_incremental_vacuum`).
+    """
+    if task not in maintenance.tasks:
+        raise HTTPException(status_code=404, detail="Tarefa de manutenção não encontrada")
+    result = await maintenance.run_task(task)
+    if result is None:
+        raise HTTPException(status_code=409, detail="Tarefa de manutenção já está em execução")
+    return result
\ No newline at end of file
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from requests import Session
+from sqlalchemy.orm import Session
 from database.database import get_db
 from models.model import Supplier, User
 from schemas.schema import LoginRequest, LoginResponse
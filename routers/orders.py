@@ -1,8 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from app import settings
+from app.changefeed import change_feed
+from app.etag import make_etag, parse_if_match
+from app.pagination import CountMode, set_total_count
 from database.database import get_db
 from schemas.schema import *
 from crud.orders import *
+from crud.order_archive import get_all_orders_with_archive, get_archived_order
+from crud.versioning import VersionConflictError
+from crud.counters import count_rows
+from models.model import Order, OrderArchive
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -26,24 +38,100 @@ def create_new_order(order: OrderCreate, db: Session = Depends(get_db)):
     """
     return create_order(db=db, order=order)
 
+@router.get(
+    "/changes",
+    response_model=OrderChangesPage,
+    summary="Lista as mudanças de pedidos (long-polling)",
+    description="Endpoint para consumir o log de mudanças de pedidos a partir de uma sequência. "
+                "Se não houver mudanças, aguarda até `wait` segundos antes de responder.",
+    response_description="Retorna as mudanças encontradas e a sequência a usar na próxima chamada."
+)
+async def read_order_changes(
+    since: int = 0,
+    supplier_id: Optional[int] = None,
+    wait: float = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Lista as mudanças (criação, atualização e exclusão) de pedidos.
+
+    - **since**: Retorna apenas mudanças com sequência maior que este valor.
+    - **supplier_id**: Filtra as mudanças pelos pedidos de um fornecedor (opcional).
+    - **wait**: Tempo máximo (segundos) de espera por novas mudanças (long-polling).
+    - **limit**: Número máximo de mudanças retornadas.
+
+    Use `last_seq` da resposta como `since` na próxima chamada.
+    """
+    wait = min(wait, settings.CHANGE_FEED_MAX_WAIT)
+    changes, last_seq = await change_feed.wait_for_changes(since, supplier_id, timeout=wait, limit=limit)
+    return {"changes": changes, "last_seq": last_seq}
+
+@router.get(
+    "/changes/stream",
+    summary="Stream de mudanças de pedidos (Server-Sent Events)",
+    description="Endpoint que mantém a conexão aberta e envia cada mudança de pedido como um "
+                "evento SSE. Suporta retomada pelo cabeçalho `Last-Event-ID`.",
+    response_description="Stream `text/event-stream` com as mudanças de pedidos."
+)
+async def stream_order_changes(
+    request: Request,
+    since: Optional[int] = None,
+    supplier_id: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None)
+):
+    """
+    Envia as mudanças de pedidos como Server-Sent Events.
+
+    - **since**: Sequência a partir da qual enviar as mudanças (padrão: apenas novas mudanças).
+    - **supplier_id**: Filtra as mudanças pelos pedidos de um fornecedor (opcional).
+
+    Cada evento tem `id` igual à sequência da mudança; ao reconectar, o navegador envia
+    `Last-Event-ID` e o stream continua de onde parou.
+    """
+    if last_event_id is not None:
+        since = last_event_id
+    if since is None:
+        since = await change_feed.current_seq()
+
+    async def events():
+        cursor = since
+        while not await request.is_disconnected():
+            changes, cursor = await change_feed.wait_for_changes(
+                cursor, supplier_id, timeout=settings.CHANGE_FEED_HEARTBEAT
+            )
+            if not changes:
+                yield ": keep-alive\n\n"
+                continue
+            for change in changes:
+                data = json.dumps(jsonable_encoder(change))
+                yield f"id: {change['seq']}\nevent: order\ndata: {data}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @router.get(
     "/{order_id}",
     response_model=OrderInDB,
     summary="Busca um pedido por ID",
-    description="Endpoint para buscar um pedido específico pelo seu ID.",
+    description="Endpoint para buscar um pedido específico pelo seu ID, "
+                "inclusive entre os pedidos arquivados.",
     response_description="Retorna os detalhes do pedido encontrado."
 )
-def read_order(order_id: int, db: Session = Depends(get_db)):
+def read_order(order_id: int, response: Response, db: Session = Depends(get_db)):
     """
     Busca um pedido pelo seu ID.
 
     - **order_id**: ID do pedido a ser buscado.
 
-    Se o pedido não for encontrado, retorna um erro 404.
+    Se o pedido não estiver entre os ativos, é buscado entre os arquivados (campo
+    `archived_at` preenchido). Se não for encontrado, retorna um erro 404.
+    A versão atual é retornada no cabeçalho `ETag`.
     """
     db_order = get_order(db, order_id=order_id)
+    if db_order is None:
+        db_order = get_archived_order(db, order_id=order_id)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Pedido não encontrado")
+    response.headers["ETag"] = make_etag(db_order.version)
     return db_order
 
 @router.get(
@@ -51,19 +139,47 @@ def read_order(order_id: int, db: Session = Depends(get_db)):
     response_model=list[OrderInDB],
     summary="Lista todos os pedidos",
     description="Endpoint para listar todos os pedidos cadastrados no sistema. "
-                "Permite paginação usando os parâmetros `skip` e `limit`.",
+                "Permite paginação usando os parâmetros `skip` e `limit` e filtros por status, "
+                "fornecedor e usuário. Pedidos arquivados só são incluídos com `include_archived=true`. "
+                "O total de registros é retornado no cabeçalho `X-Total-Count`.",
     response_description="Retorna uma lista de pedidos."
 )
-def read_all_orders(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+def read_all_orders(
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    status: Optional[str] = None,
+    supplier_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    include_archived: bool = False,
+    count: CountMode = "exact",
+    db: Session = Depends(get_db)
+):
     """
     Lista todos os pedidos cadastrados.
 
     - **skip**: Número de registros a serem ignorados (para paginação).
     - **limit**: Número máximo de registros a serem retornados (para paginação).
+    - **status**, **supplier_id**, **user_id**: Filtros opcionais.
+    - **include_archived**: Se verdadeiro, inclui os pedidos arquivados (ordenados por ID).
+    - **count**: `exact` (padrão) ou `estimate` retornam o total de registros no cabeçalho
+      `X-Total-Count`; `none` não calcula o total. Com filtros, o total exato fica em cache
+      por alguns segundos e `estimate` evita a contagem completa.
 
     Retorna uma lista de pedidos.
     """
-    orders = get_all_orders(db, skip=skip, limit=limit)
+    filters = {"status": status, "supplier_id": supplier_id, "user_id": user_id}
+    if count != "none":
+        models = [Order, OrderArchive] if include_archived else [Order]
+        totals = [
+            count_rows(db, model, filters, mode=count, ttl=settings.COUNT_CACHE_TTL,
+                       sample_size=settings.COUNT_SAMPLE_SIZE)
+            for model in models
+        ]
+        set_total_count(response, sum(total for total, _ in totals), any(estimated for _, estimated in totals))
+    if include_archived:
+        return get_all_orders_with_archive(db, skip=skip, limit=limit, **filters)
+    orders = get_all_orders(db, skip=skip, limit=limit, **filters)
     return orders
 
 @router.put(
@@ -71,22 +187,41 @@ def read_all_orders(skip: int = 0, limit: int = 10, db: Session = Depends(get_db
     response_model=OrderInDB,
     summary="Atualiza um pedido existente",
     description="Endpoint para atualizar os dados de um pedido existente. "
-                "Apenas os campos fornecidos serão atualizados.",
+                "Apenas os campos fornecidos serão atualizados. "
+                "Aceita o cabeçalho `If-Match` para evitar sobrescrever alterações concorrentes.",
     response_description="Retorna os detalhes do pedido atualizado."
 )
-def update_existing_order(order_id: int, order: OrderUpdate, db: Session = Depends(get_db)):
+def update_existing_order(
+    order_id: int,
+    order: OrderUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     Atualiza os dados de um pedido existente.
 
     - **order_id**: ID do pedido a ser atualizado.
     - **order**: Dados do pedido a serem atualizados (apenas os campos fornecidos).
+    - **If-Match**: Versão esperada do pedido (`ETag` retornado na leitura). Também pode ser
+      informada no campo `version` do corpo.
 
     Se o pedido não for encontrado, retorna um erro 404.
+    Se o pedido tiver sido alterado por outra requisição desde a versão informada, retorna um erro 409.
     """
-    db_order = get_order(db, order_id=order_id)
+    try:
+        db_order = update_order(
+            db=db, order_id=order_id, order=order, expected_version=parse_if_match(if_match)
+        )
+    except VersionConflictError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Pedido alterado por outra requisição (versão atual: {exc.current_version})"
+        )
     if db_order is None:
         raise HTTPException(status_code=404, detail="Pedido não encontrado")
-    return update_order(db=db, order_id=order_id, order=order)
+    response.headers["ETag"] = make_etag(db_order.version)
+    return db_order
 
 @router.delete(
     "/{order_id}",
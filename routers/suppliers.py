@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Header, Response, UploadFile
 from sqlalchemy.orm import Session
+from app import settings
+from app.csv_upload import open_csv
+from app.etag import make_etag, parse_if_match
+from app.pagination import CountMode, set_total_count
+from crud.counters import count_rows
 from database.database import get_db
+from models.model import Supplier
 from schemas.schema import *
 from crud.suppliers import *
+from crud.versioning import VersionConflictError
 
 router = APIRouter(prefix="/suppliers", tags=["suppliers"])
 
@@ -35,6 +43,28 @@ def create_new_supplier(supplier: SupplierCreate, db: Session = Depends(get_db))
     
     return create_supplier(db=db, supplier=supplier)
 
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    summary="Importa fornecedores de um arquivo CSV",
+    description="Endpoint para cadastrar fornecedores em massa a partir de um arquivo CSV com as colunas "
+                "`name`, `email`, `cnpj`, `password` e, opcionalmente, `phone`. "
+                "O arquivo é lido e gravado em lotes, sem ser carregado inteiro na memória.",
+    response_description="Retorna os totais da importação e os erros por linha."
+)
+def import_suppliers_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Importa fornecedores de um arquivo CSV (UTF-8, separado por vírgula ou ponto e vírgula).
+
+    - **file**: Arquivo CSV com uma linha de cabeçalho.
+
+    Linhas inválidas, com CNPJ ou e-mail repetido no arquivo ou já registrado são ignoradas
+    e listadas em `errors` (até `IMPORT_MAX_ERRORS`); as demais são gravadas em lotes de
+    `IMPORT_CHUNK_SIZE`. Se faltar uma coluna obrigatória, retorna um erro 400.
+    """
+    reader = open_csv(file, SupplierCreate)
+    return import_suppliers(db, reader, settings.IMPORT_CHUNK_SIZE, settings.IMPORT_MAX_ERRORS)
+
 @router.get(
     "/{supplier_id}",
     response_model=SupplierInDB,
@@ -42,17 +72,19 @@ def create_new_supplier(supplier: SupplierCreate, db: Session = Depends(get_db))
     description="Endpoint para buscar um fornecedor específico pelo seu ID.",
     response_description="Retorna os detalhes do fornecedor encontrado."
 )
-def read_supplier(supplier_id: int, db: Session = Depends(get_db)):
+def read_supplier(supplier_id: int, response: Response, db: Session = Depends(get_db)):
     """
     Busca um fornecedor pelo seu ID.
 
     - **supplier_id**: ID do fornecedor a ser buscado.
 
     Se o fornecedor não for encontrado, retorna um erro 404.
+    A versão atual é retornada no cabeçalho `ETag`.
     """
     db_supplier = get_supplier(db, supplier_id=supplier_id)
     if db_supplier is None:
         raise HTTPException(status_code=404, detail="Fornecedor não encontrado")
+    response.headers["ETag"] = make_etag(db_supplier.version)
     return db_supplier
 
 @router.get(
@@ -60,18 +92,29 @@ def read_supplier(supplier_id: int, db: Session = Depends(get_db)):
     response_model=list[SupplierInDB],
     summary="Lista todos os fornecedores",
     description="Endpoint para listar todos os fornecedores cadastrados no sistema. "
-                "Permite paginação usando os parâmetros `skip` e `limit`.",
+                "Permite paginação usando os parâmetros `skip` e `limit`. "
+                "O total de registros é retornado no cabeçalho `X-Total-Count`.",
     response_description="Retorna uma lista de fornecedores."
 )
-def read_all_suppliers(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+def read_all_suppliers(
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    count: CountMode = "exact",
+    db: Session = Depends(get_db)
+):
     """
     Lista todos os fornecedores cadastrados.
 
     - **skip**: Número de registros a serem ignorados (para paginação).
     - **limit**: Número máximo de registros a serem retornados (para paginação).
+    - **count**: `exact` (padrão) ou `estimate` retornam o total de registros no cabeçalho
+      `X-Total-Count`; `none` não calcula o total.
 
     Retorna uma lista de fornecedores.
     """
+    if count != "none":
+        set_total_count(response, *count_rows(db, Supplier, mode=count))
     suppliers = get_all_suppliers(db, skip=skip, limit=limit)
     return suppliers
 
@@ -80,22 +123,41 @@ def read_all_suppliers(skip: int = 0, limit: int = 10, db: Session = Depends(get
     response_model=SupplierInDB,
     summary="Atualiza um fornecedor existente",
     description="Endpoint para atualizar os dados de um fornecedor existente. "
-                "Apenas os campos fornecidos serão atualizados.",
+                "Apenas os campos fornecidos serão atualizados. "
+                "Aceita o cabeçalho `If-Match` para evitar sobrescrever alterações concorrentes.",
     response_description="Retorna os detalhes do fornecedor atualizado."
 )
-def update_existing_supplier(supplier_id: int, supplier: SupplierUpdate, db: Session = Depends(get_db)):
+def update_existing_supplier(
+    supplier_id: int,
+    supplier: SupplierUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
     """
     Atualiza os dados de um fornecedor existente.
 
     - **supplier_id**: ID do fornecedor a ser atualizado.
     - **supplier**: Dados do fornecedor a serem atualizados (apenas os campos fornecidos).
+    - **If-Match**: Versão esperada do fornecedor (`ETag` retornado na leitura). Também pode ser
+      informada no campo `version` do corpo.
 
     Se o fornecedor não for encontrado, retorna um erro 404.
+    Se o fornecedor tiver sido alterado por outra requisição desde a versão informada, retorna um erro 409.
     """
-    db_supplier = get_supplier(db, supplier_id=supplier_id)
+    try:
+        db_supplier = update_supplier(
+            db=db, supplier_id=supplier_id, supplier=supplier, expected_version=parse_if_match(if_match)
+        )
+    except VersionConflictError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Fornecedor alterado por outra requisição (versão atual: {exc.current_version})"
+        )
     if db_supplier is None:
         raise HTTPException(status_code=404, detail="Fornecedor não encontrado")
-    return update_supplier(db=db, supplier_id=supplier_id, supplier=supplier)
+    response.headers["ETag"] = make_etag(db_supplier.version)
+    return db_supplier
 
 @router.delete(
     "/{supplier_id}",
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
 from sqlalchemy.orm import Session
+from app import settings
+from app.csv_upload import open_csv
+from app.pagination import CountMode, set_total_count
+from crud.counters import count_rows
 from database.database import get_db
+from models.model import User
 from schemas.schema import *
 from crud.users import *
 
@@ -32,6 +37,30 @@ def create_new_user(user: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Email já registrado")
     return create_user(db=db, user=user)
 
+# Importar usuários de um CSV
+@router.post(
+    "/import",
+    response_model=ImportReport,
+    summary="Importa usuários de um arquivo CSV",
+    description="Endpoint para cadastrar usuários em massa a partir de um arquivo CSV com as colunas "
+                "`name`, `email`, `cpf`, `password` e, opcionalmente, `phone`. "
+                "O arquivo é lido e gravado em lotes, sem ser carregado inteiro na memória.",
+    response_description="Retorna os totais da importação e os erros por linha."
+)
+def import_users_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Importa usuários de um arquivo CSV (UTF-8, separado por vírgula ou ponto e vírgula).
+
+    - **file**: Arquivo CSV com uma linha de cabeçalho.
+
+    Linhas inválidas, com CPF ou e-mail repetido no arquivo ou já registrado são ignoradas
+    e listadas em `errors` (até `IMPORT_MAX_ERRORS`); as demais são gravadas em lotes de
+    `IMPORT_CHUNK_SIZE`, com o papel padrão "user". Se faltar uma coluna obrigatória,
+    retorna um erro 400.
+    """
+    reader = open_csv(file, UserCreate)
+    return import_users(db, reader, settings.IMPORT_CHUNK_SIZE, settings.IMPORT_MAX_ERRORS)
+
 # Buscar um usuário por ID
 @router.get(
     "/{user_id}",
@@ -59,18 +88,29 @@ def read_user(user_id: int, db: Session = Depends(get_db)):
     response_model=list[UserInDB],
     summary="Lista todos os usuários",
     description="Endpoint para listar todos os usuários cadastrados no sistema. "
-                "Permite paginação usando os parâmetros `skip` e `limit`.",
+                "Permite paginação usando os parâmetros `skip` e `limit`. "
+                "O total de registros é retornado no cabeçalho `X-Total-Count`.",
     response_description="Retorna uma lista de usuários."
 )
-def read_all_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
+def read_all_users(
+    response: Response,
+    skip: int = 0,
+    limit: int = 10,
+    count: CountMode = "exact",
+    db: Session = Depends(get_db)
+):
     """
     Lista todos os usuários cadastrados.
 
     - **skip**: Número de registros a serem ignorados (para paginação).
     - **limit**: Número máximo de registros a serem retornados (para paginação).
+    - **count**: `exact` (padrão) ou `estimate` retornam o total de registros no cabeçalho
+      `X-Total-Count`; `none` não calcula o total.
 
     Retorna uma lista de usuários.
     """
+    if count != "none":
+        set_total_count(response, *count_rows(db, User, mode=count))
     users = get_all_users(db, skip=skip, limit=limit)
     return users
 
@@ -52,12 +52,14 @@ class SupplierUpdate(BaseModel):
     email: Optional[EmailStr] = None
     phone: Optional[str] = None
     password: Optional[str] = None
+    version: Optional[int] = None  # Versão esperada (alternativa ao cabeçalho If-Match)
 
 class SupplierInDB(SupplierBase):
     id: int
     created_at: datetime
     updated_at: datetime
     is_active: bool
+    version: int
 
     class Config:
         from_attributes = True
@@ -76,15 +78,31 @@ class OrderUpdate(BaseModel):
     product_type: Optional[str] = None
     quantity: Optional[int] = None
     status: Optional[str] = None
+    version: Optional[int] = None  # Versão esperada (alternativa ao cabeçalho If-Match)
 
 class OrderInDB(OrderBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    version: int
+    archived_at: Optional[datetime] = None  # Preenchido apenas para pedidos arquivados
 
     class Config:
         from_attributes = True
 
+class OrderChangeOut(BaseModel):
+    seq: int
+    order_id: int
+    supplier_id: Optional[int] = None
+    operation: str  # "create", "update", "delete" ou "archive"
+    status: Optional[str] = None
+    order: Optional[dict] = None
+    created_at: datetime
+
+class OrderChangesPage(BaseModel):
+    changes: list[OrderChangeOut]
+    last_seq: int
+
 class AddressBase(BaseModel):
     cep: str
     street: str
@@ -111,4 +129,17 @@ class AddressInDB(AddressBase):
     supplier_id: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Esquemas para importação de CSV
+class ImportRowError(BaseModel):
+    line: int
+    message: str
+
+class ImportReport(BaseModel):
+    processed: int
+    created: int
+    duplicates: int
+    invalid: int
+    errors: list[ImportRowError]
+    errors_truncated: bool
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Servidor de produção.
+
+O processo pai prepara o banco (migrate) e cria a aplicação uma única vez; depois abre
+o socket e cria os processos de trabalho com fork. Os workers herdam os módulos já
+carregados e sobem em milissegundos, sem repetir imports nem a criação do esquema.
+Workers que terminam inesperadamente são recriados.
+
+Os módulos (rotas, modelos, bcrypt) são importados de propósito no processo pai, antes
+do fork: adiá-los para o primeiro uso faria cada worker pagar o import na primeira
+requisição. Só é adiado o que não pode ser herdado pelo fork: o pool de processos do
+bcrypt, o leitor do log de mudanças e o agendador de manutenção são criados dentro de
+cada worker, no primeiro uso ou no lifespan.
+
+Em sistemas sem fork (Windows) são usados os workers do próprio uvicorn.
+
+Uso:
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import os
+import signal
+import time
+
+import uvicorn
+
+from app import settings
+
+
+def preload():
+    from app.api import create_app
+    from database.database import engine
+    from database.migrations import migrate
+
+    migrate()
+    app = create_app()
+    # Conexões abertas no processo pai não podem ser compartilhadas com os workers
+    engine.dispose()
+    return app
+
+
+def make_config(app, args) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=args.host,
+        port=args.port,
+        log_level=args.log_level,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+    )
+
+
+def spawn_worker(app, sock, args) -> int:
+    pid = os.fork()
+    if pid != 0:
+        return pid
+    # Processo filho: restaura os sinais padrão (o uvicorn instala os seus ao iniciar)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        uvicorn.Server(make_config(app, args)).run(sockets=[sock])
+    finally:
+        os._exit(0)
+
+
+def supervise(app, args):
+    sock = make_config(app, args).bind_socket()
+    workers = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(args.workers):
+        workers[spawn_worker(app, sock, args)] = time.monotonic()
+
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        started_at = workers.pop(pid, None)
+        if stopping or started_at is None:
+            continue
+        if time.monotonic() - started_at < 1:
+            # Evita recriar em laço um worker que falha ao iniciar
+            time.sleep(1)
+        workers[spawn_worker(app, sock, args)] = time.monotonic()
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WORKERS)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--forwarded-allow-ips", default="127.0.0.1")
+    args = parser.parse_args()
+
+    if args.workers > 1 and not hasattr(os, "fork"):
+        from database.migrations import migrate
+
+        migrate()
+        uvicorn.run(
+            "app.api:create_app",
+            factory=True,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level,
+            proxy_headers=True,
+            forwarded_allow_ips=args.forwarded_allow_ips,
+        )
+        return
+
+    app = preload()
+    if args.workers <= 1:
+        uvicorn.Server(make_config(app, args)).run()
+        return
+    supervise(app, args)
+
+
+if __name__ == "__main__":
+    main()
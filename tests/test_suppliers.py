@@ -0,0 +1,49 @@
+import bcrypt
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import models.model  # registra os modelos em Base.metadata
+from crud.suppliers import create_supplier, update_supplier
+from database.database import Base
+from schemas.schema import SupplierCreate, SupplierUpdate
+
+
+@pytest.fixture
+def db():
+    # Banco em memória: os testes não tocam em database/optics.db
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_update_supplier_stores_password_hash(db):
+    supplier = create_supplier(db, SupplierCreate(
+        name="Ótica Teste", email="otica@example.com", cnpj="12345678000199", password="oldpw"
+    ))
+
+    updated = update_supplier(db, supplier.id, SupplierUpdate(password="newpw"))
+
+    stored = db.execute(text("SELECT password FROM suppliers WHERE id = :id"), {"id": supplier.id}).scalar()
+    assert stored != "newpw"
+    assert bcrypt.checkpw(b"newpw", stored.encode("utf-8"))
+    assert updated.check_password("newpw")
+    assert updated.version == 2
+
+
+def test_update_supplier_without_password_keeps_hash(db):
+    supplier = create_supplier(db, SupplierCreate(
+        name="Ótica Teste", email="otica@example.com", cnpj="12345678000199", password="oldpw"
+    ))
+    old_hash = supplier.password
+
+    update_supplier(db, supplier.id, SupplierUpdate(phone="11999999999"))
+
+    stored = db.execute(text("SELECT password FROM suppliers WHERE id = :id"), {"id": supplier.id}).scalar()
+    assert stored == old_hash